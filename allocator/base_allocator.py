@@ -1,32 +1,27 @@
 
-from src.allocator.block import Block
+from src.allocator.physical_memory import PhysicalMemory
 
 class BaseAllocator:
     def __init__(self, total_size):
-        self.blocks = [Block(0, total_size)]
-        self.next_id = 1
+        self.memory = PhysicalMemory(total_size)
         self.total_size = total_size
 
+    @property
+    def blocks(self):
+        return self.memory.blocks
+
+    @property
+    def next_id(self):
+        return self.memory.next_id
+
     def malloc(self, size):
         raise NotImplementedError
 
     def free(self, block_id):
-        for b in self.blocks:
-            if b.block_id == block_id:
-                b.free = True
-                b.block_id = None
-                self.coalesce()
-                return True
-        return False
+        return self.memory.free(block_id)
 
     def coalesce(self):
-        i = 0
-        while i < len(self.blocks)-1:
-            if self.blocks[i].free and self.blocks[i+1].free:
-                self.blocks[i].size += self.blocks[i+1].size
-                self.blocks.pop(i+1)
-            else:
-                i += 1
+        self.memory.coalesce()
 
     def dump(self):
-        return "\n".join(str(b) for b in self.blocks)
+        return self.memory.dump()
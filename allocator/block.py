@@ -1,11 +1,18 @@
 
+
 class Block:
+    __slots__ = ("start", "size", "free", "block_id", "prev", "next")
+
     def __init__(self, start, size, free=True, block_id=None):
         self.start = start
         self.size = size
         self.free = free
         self.block_id = block_id
 
+        # Address-ordered neighbours inside PhysicalMemory
+        self.prev = None
+        self.next = None
+
     def end(self):
         return self.start + self.size
 
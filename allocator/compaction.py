@@ -0,0 +1,241 @@
+import time
+from bisect import bisect_left, insort
+
+_now = time.perf_counter_ns
+
+# Cheapest windows tried by make_room() before falling back to a full pass
+MAX_WINDOWS = 16
+
+
+def _prefix(values):
+    # Exclusive running sums: 0, v0, v0 + v1, ...
+    total = 0
+    for value in values:
+        yield total
+        total += value
+
+
+class Compactor:
+    # Relocates used blocks of a PhysicalMemory to remove holes. Blocks keep
+    # their ids; every operation returns a relocation map
+    # {old start: new start} for the blocks it moved, and the total cost
+    # (bytes / blocks moved, time) accumulates on the compactor.
+    def __init__(self, memory):
+        self.memory = memory
+
+        self.runs = 0
+        self.blocks_moved = 0
+        self.bytes_moved = 0
+        self.time_ns = 0
+        self.rescued = 0          # failed allocations that fit after make_room
+
+    @property
+    def done(self):
+        # At most one hole, at the top of memory
+        hole = self.memory.free_index.lowest()
+        return hole is None or hole.next is None
+
+    # ---------- Sliding compaction ----------
+    def compact(self):
+        # Slide every used block down: one hole at the top of memory
+        return self.step(None)
+
+    def step(self, budget):
+        # Incremental sliding compaction: moves blocks from the lowest hole
+        # up until `budget` bytes are moved (at least one block, so every
+        # step makes progress); None = no limit
+        start_ns = _now()
+        relocations, moved = self._slide(budget)
+        self._account(relocations, moved, start_ns)
+        return relocations
+
+    def _slide(self, budget, hole=None, stop=None):
+        # Slide blocks down over `hole` (default: the lowest one) until the
+        # hole reaches address `stop` (default: the top of memory)
+        memory = self.memory
+        relocations = {}
+        moved = 0
+
+        if hole is None:
+            hole = memory.free_index.lowest()
+        while hole is not None and hole.next is not None:
+            block = hole.next     # free blocks are coalesced: this one is used
+            if stop is not None and block.start >= stop:
+                break
+            if budget is not None and moved and moved + block.size > budget:
+                break
+            old_start = block.start
+            moved += memory.slide(block.block_id)
+            relocations[old_start] = block.start
+        return relocations, moved
+
+    # ---------- Targeted compaction ----------
+    def make_room(self, size):
+        # Free a hole of at least `size` moving as few bytes as possible.
+        # Two kinds of plan are costed and the cheaper one is carried out:
+        #   slide: run of consecutive holes holding >= size, with the fewest
+        #          used bytes between them; those blocks slide down
+        #   evict: address window spanning >= size with the fewest used
+        #          bytes, whose blocks fit into holes outside it
+        # -> relocation map, or None if even full compaction cannot make room
+        memory = self.memory
+        if memory.largest_free() >= size:
+            return {}
+        if memory.free_bytes < size:
+            return None
+
+        start_ns = _now()
+        blocks = memory.blocks
+        slide_cost, first_hole, stop = self._slide_window(blocks, size)
+
+        for used, first, last in self._windows(blocks, size)[:MAX_WINDOWS]:
+            if used >= slide_cost:
+                break
+            plan = self._plan(blocks, first, last, used)
+            if plan is None:
+                continue
+
+            relocations = {}
+            by_start = memory.free_index.blocks
+            for block_id, old_start, target in plan:
+                relocations[old_start] = memory.move(block_id, by_start[target])
+            self._account(relocations, used, start_ns)
+            return relocations
+
+        relocations, moved = self._slide(None, first_hole, stop)
+        self._account(relocations, moved, start_ns)
+        return relocations
+
+    def _slide_window(self, blocks, size):
+        # -> (used bytes, first hole, end address of the last hole) for the
+        # run of consecutive holes with >= size free bytes and the fewest
+        # used bytes in between
+        holes = [b for b in blocks if b.free]
+        # used[k] = used bytes below hole k
+        used = [hole.start - free for hole, free in zip(holes, _prefix(h.size for h in holes))]
+
+        best = None
+        free = 0
+        j = -1
+        for i, hole in enumerate(holes):
+            while free < size and j + 1 < len(holes):
+                j += 1
+                free += holes[j].size
+            if free < size:
+                break
+            cost = used[j] - used[i]
+            if best is None or cost < best[0]:
+                best = (cost, hole, holes[j].start + holes[j].size)
+            free -= hole.size
+        return best
+
+    def _windows(self, blocks, size):
+        # (used bytes, first, last) for the shortest window of blocks
+        # spanning >= size from each starting block, cheapest first
+        windows = []
+        used = 0
+        last = -1
+        for first, block in enumerate(blocks):
+            while last + 1 < len(blocks) and (
+                    last < first or blocks[last].start + blocks[last].size - block.start < size):
+                last += 1
+                if not blocks[last].free:
+                    used += blocks[last].size
+            if blocks[last].start + blocks[last].size - block.start < size:
+                break
+            windows.append((used, first, last))
+            if not block.free:
+                used -= block.size
+        windows.sort()
+        return windows
+
+    def _plan(self, blocks, first, last, used):
+        # Moves (block id, old start, target hole start) that empty the
+        # window, best fit and largest block first; None if they do not fit
+        # Take in the holes on either side: the window's neighbours are then
+        # used blocks, so freeing the window never merges into a target
+        if first > 0 and blocks[first - 1].free:
+            first -= 1
+        if last + 1 < len(blocks) and blocks[last + 1].free:
+            last += 1
+        low = blocks[first].start
+        high = blocks[last].start + blocks[last].size
+
+        holes = sorted(
+            (hole.size, start)
+            for start, hole in self.memory.free_index.blocks.items()
+            if not low <= start < high
+        )
+        if sum(hole_size for hole_size, _ in holes) < used:
+            return None
+
+        plan = []
+        movers = sorted(
+            (b for b in blocks[first:last + 1] if not b.free),
+            key=lambda b: b.size, reverse=True
+        )
+        for block in movers:
+            i = bisect_left(holes, (block.size, -1))
+            if i == len(holes):
+                return None
+            hole_size, start = holes.pop(i)
+            plan.append((block.block_id, block.start, start))
+            if hole_size > block.size:
+                insort(holes, (hole_size - block.size, start + block.size))
+        return plan
+
+    # ---------- Cost ----------
+    def _account(self, relocations, moved, start_ns):
+        elapsed = _now() - start_ns
+        self.runs += 1
+        self.blocks_moved += len(relocations)
+        self.bytes_moved += moved
+        self.time_ns += elapsed
+
+        probe = self.memory.probe
+        if probe is not None:
+            probe.record("compaction_bytes", moved)
+            probe.record("compaction_ns", elapsed)
+
+    def summary(self):
+        return {
+            "runs": self.runs,
+            "blocks_moved": self.blocks_moved,
+            "bytes_moved": self.bytes_moved,
+            "time_ms": self.time_ns / 1e6,
+            "rescued_allocations": self.rescued,
+        }
+
+
+class CompactingStrategy:
+    # Wraps a placement strategy (FirstFit, TLSF, ...) for the compactor's
+    # memory. A failed allocation triggers make_room() and one retry; room
+    # is made for the strategy's fit_size(size) if it has one (TLSF skips
+    # holes of the request's own size class, so a hole of `size` may not be
+    # enough). With `step_bytes`, every allocation also runs one bounded
+    # compaction step while memory is fragmented, spreading the cost over
+    # the run.
+    def __init__(self, strategy, compactor, step_bytes=None):
+        self.strategy = strategy
+        self.compactor = compactor
+        self.step_bytes = step_bytes
+        self.relocations = {}      # from the latest compaction
+
+    def malloc(self, memory, size):
+        compactor = self.compactor
+        if self.step_bytes is not None and not compactor.done:
+            self.relocations = compactor.step(self.step_bytes)
+
+        block_id = self.strategy.malloc(memory, size)
+        if block_id is not None:
+            return block_id
+
+        fit_size = getattr(self.strategy, "fit_size", None)
+        relocations = compactor.make_room(size if fit_size is None else fit_size(size))
+        if not relocations:
+            return None     # no room even after compaction (or nothing to move)
+        self.relocations = relocations
+        block_id = self.strategy.malloc(memory, size)
+        if block_id is not None:
+            compactor.rescued += 1
+        return block_id
@@ -0,0 +1,281 @@
+
+import random
+
+from src.allocator.tlsf import SegregatedFreeLists
+
+
+class _Node:
+    __slots__ = ("key", "start", "size", "max_size", "priority", "left", "right")
+
+    def __init__(self, key, start, size, priority):
+        self.key = key
+        self.start = start
+        self.size = size
+        self.max_size = size
+        self.priority = priority
+        self.left = None
+        self.right = None
+
+
+def _update(node):
+    best = node.size
+    if node.left is not None and node.left.max_size > best:
+        best = node.left.max_size
+    if node.right is not None and node.right.max_size > best:
+        best = node.right.max_size
+    node.max_size = best
+
+
+def _split(node, key):
+    # -> (nodes with key < key, nodes with key >= key)
+    if node is None:
+        return None, None
+    if node.key < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        _update(node)
+        return node, right
+    left, right = _split(node.left, key)
+    node.left = right
+    _update(node)
+    return left, node
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+def _insert(root, node):
+    left, right = _split(root, node.key)
+    return _merge(_merge(left, node), right)
+
+
+def _delete(node, key):
+    if node.key == key:
+        return _merge(node.left, node.right)
+    if key < node.key:
+        node.left = _delete(node.left, key)
+    else:
+        node.right = _delete(node.right, key)
+    _update(node)
+    return node
+
+
+def _build(nodes):
+    # Treap over nodes already sorted by key in O(n): the right spine is
+    # the stack
+    stack = []
+    for node in nodes:
+        last = None
+        while stack and stack[-1].priority < node.priority:
+            last = stack.pop()
+        node.left = last
+        if stack:
+            stack[-1].right = node
+        stack.append(node)
+    root = stack[0] if stack else None
+
+    # Subtree maxima, children before parents
+    order = []
+    pending = [root] if root is not None else []
+    while pending:
+        node = pending.pop()
+        order.append(node)
+        if node.left is not None:
+            pending.append(node.left)
+        if node.right is not None:
+            pending.append(node.right)
+    for node in reversed(order):
+        _update(node)
+    return root
+
+
+# Index over the free blocks of a PhysicalMemory:
+#   root      : treap keyed by start, augmented with
+#               the largest size in each subtree    -> first fit
+#   size_root : treap keyed by (size, start)        -> best fit / worst fit
+#   segregated : TLSF size classes + bitmaps         -> constant-time fit
+# The segregated lists are always kept (O(1) per update). Each treap is
+# built the first time a search needs it and maintained from then on, so
+# a memory only ever driven by TLSF never pays the O(log n) treap updates.
+class FreeIndex:
+    def __init__(self):
+        self.blocks = {}      # start -> free Block
+        self.root = None
+        self.size_root = None
+        self.by_start = False     # root is built and maintained
+        self.by_size = False      # size_root is built and maintained
+        self.segregated = SegregatedFreeLists()
+        self._rng = random.Random(0)
+        self.probe = None      # stats.instrument.Probe
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def add(self, block):
+        start, size = block.start, block.size
+        self.blocks[start] = block
+
+        if self.by_start:
+            self.root = _insert(self.root, _Node(start, start, size, self._rng.random()))
+        if self.by_size:
+            self.size_root = _insert(
+                self.size_root, _Node((size, start), start, size, self._rng.random())
+            )
+
+        self.segregated.add(block)
+
+    def remove(self, block):
+        start, size = block.start, block.size
+        del self.blocks[start]
+
+        if self.by_start:
+            self.root = _delete(self.root, start)
+        if self.by_size:
+            self.size_root = _delete(self.size_root, (size, start))
+
+        self.segregated.remove(block)
+
+    def clear(self):
+        self.blocks.clear()
+        self.root = None
+        self.size_root = None
+        self.segregated.clear()
+
+    def build(self, blocks):
+        # Bulk load in O(n log n) instead of n inserts. `blocks` are added
+        # to the segregated lists in the order given, which decides which
+        # block of a size class TLSF hands out first.
+        blocks = list(blocks)
+        self.blocks = {block.start: block for block in blocks}
+        if self.by_start:
+            self._build_by_start()
+        if self.by_size:
+            self._build_by_size()
+
+        self.segregated.clear()
+        for block in blocks:
+            self.segregated.add(block)
+
+    def _build_by_start(self):
+        rng = self._rng
+        blocks = self.blocks
+        self.root = _build(
+            _Node(start, start, blocks[start].size, rng.random())
+            for start in sorted(blocks)
+        )
+        self.by_start = True
+
+    def _build_by_size(self):
+        rng = self._rng
+        self.size_root = _build(
+            _Node(key, key[1], key[0], rng.random())
+            for key in sorted((block.size, block.start) for block in self.blocks.values())
+        )
+        self.by_size = True
+
+    # ---------- Searches ----------
+    def first_fit(self, size):
+        # Lowest-address free block with block.size >= size
+        if not self.by_start:
+            self._build_by_start()
+        node = self.root
+        if node is None or node.max_size < size:
+            if self.probe is not None:
+                self.probe.record("search_length", 1)
+            return None
+
+        visited = 1
+        while True:
+            left = node.left
+            if left is not None and left.max_size >= size:
+                node = left
+            elif node.size >= size:
+                if self.probe is not None:
+                    self.probe.record("search_length", visited)
+                return self.blocks[node.start]
+            else:
+                node = node.right
+            visited += 1
+
+    def best_fit(self, size):
+        # Smallest free block that fits, lowest address on ties
+        if not self.by_size:
+            self._build_by_size()
+        block, visited = self._lower_bound(size)
+        if self.probe is not None:
+            self.probe.record("search_length", visited)
+        return block
+
+    def _lower_bound(self, size):
+        # -> (first block in (size, start) order with block.size >= size,
+        #     nodes visited)
+        node = self.size_root
+        found = None
+        visited = 0
+        while node is not None:
+            visited += 1
+            if node.size >= size:
+                found = node
+                node = node.left
+            else:
+                node = node.right
+        return (None if found is None else self.blocks[found.start]), visited
+
+    def lowest(self):
+        # Lowest-address free block (not a search: no probe record)
+        if not self.by_start:
+            self._build_by_start()
+        node = self.root
+        if node is None:
+            return None
+        while node.left is not None:
+            node = node.left
+        return self.blocks[node.start]
+
+    def largest(self):
+        # Largest free block, lowest address on ties
+        if not self.by_size:
+            self._build_by_size()
+        node = self.size_root
+        if node is None:
+            if self.probe is not None:
+                self.probe.record("search_length", 1)
+            return None
+        while node.right is not None:
+            node = node.right
+        block, visited = self._lower_bound(node.size)
+        if self.probe is not None:
+            self.probe.record("search_length", visited)
+        return block
+
+    def largest_size(self):
+        # Size of the largest free block, 0 if none (not a search: no probe
+        # record). Reads whichever structure is maintained; does not build
+        # a treap just for this.
+        if self.by_start:
+            return 0 if self.root is None else self.root.max_size
+        if self.by_size:
+            node = self.size_root
+            if node is None:
+                return 0
+            while node.right is not None:
+                node = node.right
+            return node.size
+        return self.segregated.largest_size()
+
+    def segregated_fit(self, size):
+        if self.probe is not None:
+            # TLSF: one bitmap probe per level
+            self.probe.record("search_length", 2)
+        return self.segregated.find(size)
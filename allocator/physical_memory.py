@@ -1,19 +1,185 @@
 from src.allocator.block import Block
+from src.allocator.free_index import FreeIndex
 
 class PhysicalMemory:
+    timed_methods = {"free": "free_ns"}
+
     def __init__(self, size):
         self.size = size
-        self.blocks = [Block(0, size)]
+        self.head = Block(0, size)
         self.next_id = 1
+        self.by_id = {}           # block_id -> used Block
+
+        # Kept up to date by allocate / free / coalesce
+        self.free_bytes = size
+        self.used_bytes = 0
+
+        self.probe = None         # stats.instrument.Probe
+
+        self.free_index = FreeIndex()
+        self.free_index.add(self.head)
+
+    @property
+    def blocks(self):
+        # Address-ordered snapshot of the block chain
+        out = []
+        b = self.head
+        while b is not None:
+            out.append(b)
+            b = b.next
+        return out
+
+    def allocate(self, block, size):
+        # Carve `size` units off the front of free `block`
+        index = self.free_index
+        index.remove(block)
+
+        if block.size == size:
+            new_block = block
+            new_block.free = False
+        else:
+            new_block = Block(block.start, size, False)
+            new_block.prev = block.prev
+            new_block.next = block
+            if block.prev is None:
+                self.head = new_block
+            else:
+                block.prev.next = new_block
+            block.prev = new_block
+
+            block.start += size
+            block.size -= size
+            index.add(block)
+            if self.probe is not None:
+                self.probe.count("splits")
+
+        self.free_bytes -= size
+        self.used_bytes += size
+
+        new_block.block_id = self.next_id
+        self.by_id[new_block.block_id] = new_block
+        self.next_id += 1
+        return new_block.block_id
+
+    def free(self, block_id):
+        block = self.by_id.pop(block_id, None)
+        if block is None:
+            return False
+
+        block.free = True
+        block.block_id = None
+        self.free_bytes += block.size
+        self.used_bytes -= block.size
+
+        # Boundary tags: only the two neighbours can merge
+        index = self.free_index
+        merges = 0
+
+        nxt = block.next
+        if nxt is not None and nxt.free:
+            index.remove(nxt)
+            block.size += nxt.size
+            self._unlink(nxt)
+            merges += 1
+
+        prev = block.prev
+        if prev is not None and prev.free:
+            index.remove(prev)
+            prev.size += block.size
+            self._unlink(block)
+            block = prev
+            merges += 1
+
+        index.add(block)
+        if self.probe is not None:
+            self.probe.count("merges", merges)
+        return True
+
+    # ---------- Relocation (allocator.compaction) ----------
+    def slide(self, block_id):
+        # Move a used block down over the free block right below it; the
+        # hole ends up above the block and merges with what follows.
+        # -> bytes moved (0 if the block below is not free)
+        block = self.by_id[block_id]
+        hole = block.prev
+        if hole is None or not hole.free:
+            return 0
+
+        index = self.free_index
+        index.remove(hole)
+
+        # ... prev <-> hole <-> block <-> nxt  becomes  prev <-> block <-> hole <-> nxt
+        prev = hole.prev
+        nxt = block.next
+        block.prev = prev
+        if prev is None:
+            self.head = block
+        else:
+            prev.next = block
+        block.next = hole
+        hole.prev = block
+        hole.next = nxt
+        if nxt is not None:
+            nxt.prev = hole
+
+        block.start = hole.start
+        hole.start = block.start + block.size
+
+        if nxt is not None and nxt.free:
+            index.remove(nxt)
+            hole.size += nxt.size
+            self._unlink(nxt)
+        index.add(hole)
+        return block.size
+
+    def move(self, block_id, target):
+        # Move a used block to the front of free block `target`, which must
+        # be large enough; the block keeps its id. -> new start
+        block = self.by_id[block_id]
+        next_id = self.next_id
+        moved = self.by_id.pop(self.allocate(target, block.size))
+        self.next_id = next_id
+
+        self.free(block_id)
+        moved.block_id = block_id
+        self.by_id[block_id] = moved
+        return moved.start
+
+    def _unlink(self, block):
+        if block.prev is None:
+            self.head = block.next
+        else:
+            block.prev.next = block.next
+        if block.next is not None:
+            block.next.prev = block.prev
 
     def coalesce(self):
-        i = 0
-        while i < len(self.blocks) - 1:
-            if self.blocks[i].free and self.blocks[i + 1].free:
-                self.blocks[i].size += self.blocks[i + 1].size
-                self.blocks.pop(i + 1)
+        # Full pass; only needed after blocks were edited from outside
+        free_blocks = []
+        self.by_id = {}
+        self.free_bytes = 0
+        self.used_bytes = 0
+
+        b = self.head
+        while b is not None:
+            if b.free:
+                nxt = b.next
+                while nxt is not None and nxt.free:
+                    b.size += nxt.size
+                    nxt = nxt.next
+                b.next = nxt
+                if nxt is not None:
+                    nxt.prev = b
+                free_blocks.append(b)
+                self.free_bytes += b.size
             else:
-                i += 1
+                self.by_id[b.block_id] = b
+                self.used_bytes += b.size
+            b = b.next
+        self.free_index.build(free_blocks)
+
+    def largest_free(self):
+        return self.free_index.largest_size()
 
     def dump(self):
         return "\n".join(str(b) for b in self.blocks)
@@ -0,0 +1,179 @@
+from src.buddy.buddy_allocator import BuddyAllocator
+
+
+class Slab:
+    __slots__ = ("cache", "start", "handle", "free_slots", "in_use")
+
+    def __init__(self, cache, start, handle):
+        self.cache = cache
+        self.start = start
+        self.handle = handle          # block id / buddy address to give back
+        # Stack of free slot indices, lowest slot on top
+        self.free_slots = list(range(cache.per_slab - 1, -1, -1))
+        self.in_use = 0
+
+
+class SlabCache:
+    # All slabs for one object size
+    def __init__(self, object_size, slab_size):
+        self.object_size = object_size
+        self.per_slab = slab_size // object_size
+        # Slabs with at least one free slot: start -> Slab (insertion-ordered
+        # set, popitem() takes the most recently used one)
+        self.partial = {}
+        self.slabs = 0
+        self.objects = 0
+
+
+class SlabAllocator:
+    # Object caches over a backing allocator: either a PhysicalMemory with a
+    # placement strategy (FirstFit, TLSF, ...) or a BuddyAllocator. Requests
+    # are rounded up to `align` and served from fixed-size slots of
+    # `slab_size` slabs in O(1); a slab goes back to the backing allocator as
+    # soon as its last object is freed. Objects larger than half a slab
+    # bypass the slabs and are allocated from the backing allocator directly.
+    timed_methods = {"malloc": "slab_malloc_ns", "free": "slab_free_ns"}
+
+    def __init__(self, backing, strategy=None, slab_size=4096, align=8):
+        if strategy is None and not isinstance(backing, BuddyAllocator):
+            raise ValueError("PhysicalMemory backing needs a placement strategy")
+        if slab_size < align:
+            raise ValueError("slab size must be at least the alignment")
+
+        self.backing = backing
+        self.strategy = strategy
+        self.slab_size = slab_size
+        self.align = align
+
+        self.caches = {}      # object size -> SlabCache
+        self.objects = {}     # address -> (Slab, requested size)
+        self.large = {}       # address -> (backing handle, requested size)
+
+        # Kept up to date by malloc / free (see StatsTracker.slab_*_of)
+        self.slab_bytes = 0       # held from the backing allocator as slabs
+        self.capacity_bytes = 0   # slot bytes in those slabs
+        self.object_bytes = 0     # slot bytes handed out
+        self.requested_bytes = 0  # bytes asked for by the live objects
+        self.failed_allocations = 0
+
+        self.probe = None         # stats.instrument.Probe
+
+    # ---------- Backing allocator ----------
+    def _backing_malloc(self, size):
+        # -> (start address, handle) or None
+        if self.strategy is None:
+            addr = self.backing.malloc(size)
+            return None if addr is None else (addr, addr)
+
+        block_id = self.strategy.malloc(self.backing, size)
+        if block_id is None:
+            return None
+        return self.backing.by_id[block_id].start, block_id
+
+    def _backing_free(self, handle):
+        if self.strategy is None:
+            self.backing.free_block(handle)
+        else:
+            self.backing.free(handle)
+
+    # ---------- Objects ----------
+    def malloc(self, size):
+        if size <= 0:
+            self.failed_allocations += 1
+            return None
+
+        object_size = -(-size // self.align) * self.align
+        if object_size > self.slab_size // 2:
+            return self._malloc_large(size)
+
+        cache = self.caches.get(object_size)
+        if cache is None:
+            cache = self.caches[object_size] = SlabCache(object_size, self.slab_size)
+
+        partial = cache.partial
+        if partial:
+            start, slab = partial.popitem()
+        else:
+            got = self._backing_malloc(self.slab_size)
+            if got is None:
+                self.failed_allocations += 1
+                return None
+            start, handle = got
+            slab = Slab(cache, start, handle)
+            cache.slabs += 1
+            self.slab_bytes += self.slab_size
+            self.capacity_bytes += cache.per_slab * object_size
+            if self.probe is not None:
+                self.probe.count("slabs_created")
+
+        slot = slab.free_slots.pop()
+        slab.in_use += 1
+        if slab.free_slots:
+            partial[start] = slab
+
+        addr = start + slot * object_size
+        self.objects[addr] = (slab, size)
+        cache.objects += 1
+        self.object_bytes += object_size
+        self.requested_bytes += size
+        return addr
+
+    def _malloc_large(self, size):
+        got = self._backing_malloc(size)
+        if got is None:
+            self.failed_allocations += 1
+            return None
+        addr, handle = got
+        self.large[addr] = (handle, size)
+        return addr
+
+    def free(self, addr):
+        entry = self.objects.pop(addr, None)
+        if entry is None:
+            large = self.large.pop(addr, None)
+            if large is None:
+                return False
+            self._backing_free(large[0])
+            return True
+
+        slab, size = entry
+        cache = slab.cache
+        object_size = cache.object_size
+        cache.objects -= 1
+        self.object_bytes -= object_size
+        self.requested_bytes -= size
+
+        slab.free_slots.append((addr - slab.start) // object_size)
+        slab.in_use -= 1
+
+        if slab.in_use == 0:
+            # Empty: hand the slab back
+            cache.partial.pop(slab.start, None)
+            cache.slabs -= 1
+            self.slab_bytes -= self.slab_size
+            self.capacity_bytes -= cache.per_slab * object_size
+            self._backing_free(slab.handle)
+            if self.probe is not None:
+                self.probe.count("slabs_released")
+        elif len(slab.free_slots) == 1:
+            # Was full
+            cache.partial[slab.start] = slab
+        return True
+
+    def waste_bytes(self):
+        # Slot rounding of the live objects plus slab tails no slot fits in
+        return (self.object_bytes - self.requested_bytes
+                + self.slab_bytes - self.capacity_bytes)
+
+    def cache_info(self):
+        # One row per object size
+        return [
+            {
+                "object_size": size,
+                "slabs": cache.slabs,
+                "objects": cache.objects,
+                "capacity": cache.slabs * cache.per_slab,
+                "partial_slabs": len(cache.partial),
+            }
+            for size, cache in sorted(self.caches.items())
+        ]
@@ -0,0 +1,134 @@
+
+from heapq import heapify, heappop, heappush
+
+SL_BITS = 4                  # 16 second-level classes per power of two
+SL_COUNT = 1 << SL_BITS
+
+
+def _mapping(size):
+    # size -> (first level, second level) class
+    if size < SL_COUNT:
+        return 0, size
+    t = size.bit_length() - 1
+    return t - SL_BITS + 1, (size >> (t - SL_BITS)) - SL_COUNT
+
+
+def round_up(size):
+    # Next class boundary: every block in that class or above fits `size`
+    if size >= SL_COUNT:
+        size += (1 << (size.bit_length() - 1 - SL_BITS)) - 1
+    return size
+
+
+class SegregatedFreeLists:
+    # Two-level segregated free lists with bitmaps over non-empty classes.
+    # Every size class lives in a dict (start -> Block) so insert and
+    # remove are O(1) and lookups stay insertion ordered.
+    def __init__(self):
+        self.fl_bitmap = 0
+        self.sl_bitmaps = {}     # fl -> bitmap
+        self.lists = {}          # (fl, sl) -> {start: Block}
+
+        # largest_size(): max-heaps of (-size, start) for the classes it
+        # was asked about. Removed blocks leave stale entries that are
+        # dropped lazily, and inserts wait in `pending` until the next
+        # query, so add / remove stay O(1).
+        self.heaps = {}          # (fl, sl) -> heap
+        self.pending = {}        # (fl, sl) -> entries not pushed yet
+
+    def add(self, block):
+        fl, sl = _mapping(block.size)
+        key = (fl, sl)
+        bucket = self.lists.get(key)
+        if bucket is None:
+            bucket = self.lists[key] = {}
+        bucket[block.start] = block
+
+        pending = self.pending.get(key)
+        if pending is not None:
+            pending.append((-block.size, block.start))
+            if len(pending) > 2 * len(bucket) + 16:
+                # Cheaper to rebuild from the bucket on the next query
+                del self.heaps[key]
+                del self.pending[key]
+
+        self.fl_bitmap |= 1 << fl
+        self.sl_bitmaps[fl] = self.sl_bitmaps.get(fl, 0) | (1 << sl)
+
+    def remove(self, block):
+        fl, sl = _mapping(block.size)
+        bucket = self.lists[(fl, sl)]
+        del bucket[block.start]
+
+        if not bucket:
+            self.heaps.pop((fl, sl), None)
+            self.pending.pop((fl, sl), None)
+            sl_map = self.sl_bitmaps[fl] & ~(1 << sl)
+            self.sl_bitmaps[fl] = sl_map
+            if not sl_map:
+                self.fl_bitmap &= ~(1 << fl)
+
+    def clear(self):
+        self.fl_bitmap = 0
+        self.sl_bitmaps.clear()
+        self.lists.clear()
+        self.heaps.clear()
+        self.pending.clear()
+
+    def largest_size(self):
+        # Largest block of the highest non-empty class, 0 if none; amortized
+        # O(log n) over the adds and removes since the last query
+        if not self.fl_bitmap:
+            return 0
+        fl = self.fl_bitmap.bit_length() - 1
+        key = (fl, self.sl_bitmaps[fl].bit_length() - 1)
+        bucket = self.lists[key]
+
+        heap = self.heaps.get(key)
+        if heap is None or len(heap) > 2 * len(bucket) + 16:
+            heap = self.heaps[key] = [(-block.size, start) for start, block in bucket.items()]
+            heapify(heap)
+        else:
+            for entry in self.pending[key]:
+                heappush(heap, entry)
+        self.pending[key] = []
+
+        while True:
+            size, start = heap[0]
+            block = bucket.get(start)
+            if block is not None and block.size == -size:
+                return -size
+            heappop(heap)
+
+    def find(self, size):
+        # Search from the class of round_up(size), so any block found fits
+        # (size > 0: TLSF.malloc rejects the rest)
+        fl, sl = _mapping(round_up(size))
+
+        sl_map = self.sl_bitmaps.get(fl, 0) & (-1 << sl)
+        if not sl_map:
+            fl_map = self.fl_bitmap & (-1 << (fl + 1))
+            if not fl_map:
+                return None
+            fl = (fl_map & -fl_map).bit_length() - 1
+            sl_map = self.sl_bitmaps[fl]
+
+        sl = (sl_map & -sl_map).bit_length() - 1
+        bucket = self.lists[(fl, sl)]
+        return bucket[next(iter(bucket))]
+
+
+class TLSF:
+    # malloc only looks at classes that are guaranteed to fit, so a request
+    # can fail while a block of the same class is large enough
+    def malloc(self, memory, size):
+        if size <= 0:
+            return None
+        block = memory.free_index.segregated_fit(size)
+        if block is None:
+            return None
+        return memory.allocate(block, size)
+
+    def fit_size(self, size):
+        # Smallest free block malloc(size) is sure to find
+        return round_up(size)
@@ -0,0 +1,222 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from src.allocator.best_fit import BestFit
+from src.allocator.first_fit import FirstFit
+from src.allocator.physical_memory import PhysicalMemory
+from src.allocator.tlsf import TLSF
+from src.allocator.worst_fit import WorstFit
+from src.buddy.buddy_allocator import BuddyAllocator
+from src.cache.cache_level import CacheLevel
+from src.virtual_memory.vm_manager import VirtualMemoryManager
+
+SEED = 1234
+
+
+# ---------- Synthetic workloads ----------
+# Each builder returns (prepare, run): prepare() creates fresh model state
+# and is not timed, run(state) replays n seeded operations.
+def _churn_ops(n, max_size):
+    rng = random.Random(SEED)
+    ops = []
+    live = 0
+    for _ in range(n):
+        if live and rng.random() < 0.45:
+            # Free a random live allocation (index into the live list)
+            ops.append((False, rng.randrange(live)))
+            live -= 1
+        else:
+            ops.append((True, rng.randint(1, max_size)))
+            live += 1
+    return ops
+
+
+def _skewed_addresses(n, span):
+    # 80% of accesses to a hot 10% of the span
+    rng = random.Random(SEED)
+    hot = max(1, span // 10)
+    return [
+        rng.randrange(hot) if rng.random() < 0.8 else rng.randrange(span)
+        for _ in range(n)
+    ]
+
+
+def allocator_bench(strategy_cls):
+    def build(n):
+        ops = _churn_ops(n, 256)
+        heap = max(1 << 16, n * 128)
+
+        def prepare():
+            return PhysicalMemory(heap), strategy_cls(), []
+
+        def run(state):
+            memory, strategy, live = state
+            for is_malloc, value in ops:
+                if is_malloc:
+                    block_id = strategy.malloc(memory, value)
+                    live.append(block_id)
+                else:
+                    # swap-remove keeps the pick O(1)
+                    live[value], live[-1] = live[-1], live[value]
+                    block_id = live.pop()
+                    if block_id is not None:
+                        memory.free(block_id)
+
+        return prepare, run
+    return build
+
+
+def buddy_bench(n):
+    ops = _churn_ops(n, 4096)
+
+    def prepare():
+        return BuddyAllocator(1 << 30), []
+
+    def run(state):
+        buddy, live = state
+        for is_malloc, value in ops:
+            if is_malloc:
+                live.append(buddy.malloc(value))
+            else:
+                live[value], live[-1] = live[-1], live[value]
+                addr = live.pop()
+                if addr is not None:
+                    buddy.free_block(addr)
+
+    return prepare, run
+
+
+def cache_bench(n):
+    cache_size = 1 << max(12, n.bit_length() + 2)
+    addresses = _skewed_addresses(n, cache_size * 4)
+
+    def prepare():
+        return CacheLevel("bench", cache_size, 64, 8, "LRU")
+
+    def run(cache):
+        access = cache.access
+        for address in addresses:
+            access(address)
+
+    return prepare, run
+
+
+def vm_bench(n):
+    frames = max(16, n // 100)
+    addresses = _skewed_addresses(n, frames * 4 * 4096)
+
+    def prepare():
+        return VirtualMemoryManager(frames, 4096, "LRU")
+
+    def run(vm):
+        access = vm.access
+        for address in addresses:
+            access(address)
+
+    return prepare, run
+
+
+BENCHMARKS = {
+    "first_fit": allocator_bench(FirstFit),
+    "best_fit": allocator_bench(BestFit),
+    "worst_fit": allocator_bench(WorstFit),
+    "tlsf": allocator_bench(TLSF),
+    "buddy": buddy_bench,
+    "cache_access": cache_bench,
+    "vm_access": vm_bench,
+}
+
+
+# ---------- Runner ----------
+def measure(build, n, track_memory):
+    prepare, run = build(n)
+
+    state = prepare()
+    start = time.perf_counter()
+    run(state)
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if track_memory:
+        # Separate pass: tracemalloc slows the timed loop down
+        tracemalloc.start()
+        run(prepare())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "ops": n,
+        "seconds": seconds,
+        "ops_per_sec": n / seconds if seconds else None,
+        "peak_bytes": peak,
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old, new):
+    # Print ops/sec ratios for benchmarks present in both runs
+    before = {(r["bench"], r["ops"]): r for r in old["results"]}
+    for r in new["results"]:
+        prev = before.get((r["bench"], r["ops"]))
+        if prev and prev["ops_per_sec"] and r["ops_per_sec"]:
+            ratio = r["ops_per_sec"] / prev["ops_per_sec"]
+            print(f"{r['bench']:>14} n={r['ops']:<9} {ratio:6.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulator hot-path benchmarks")
+    parser.add_argument("--min-exp", type=int, default=3, help="smallest size 10^N")
+    parser.add_argument("--max-exp", type=int, default=5, help="largest size 10^N")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS),
+                        help="run only these benchmarks")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.only or BENCHMARKS:
+        for exp in range(args.min_exp, args.max_exp + 1):
+            row = {"bench": name, **measure(BENCHMARKS[name], 10 ** exp, not args.no_memory)}
+            results.append(row)
+            peak = row["peak_bytes"]
+            print(
+                f"{name:>14} n=10^{exp:<2} {row['ops_per_sec']:>14,.0f} ops/s"
+                + (f"  peak {peak / 2**20:8.1f} MiB" if peak is not None else "")
+            )
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": SEED,
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
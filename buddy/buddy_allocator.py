@@ -1,60 +1,159 @@
-import math
+from array import array
 
 
 class BuddyAllocator:
+    timed_methods = {"malloc": "buddy_malloc_ns", "free_block": "buddy_free_ns"}
+
     def __init__(self, size):
-        if size & (size - 1) != 0:
+        if size <= 0 or size & (size - 1) != 0:
             raise ValueError("Buddy allocator size must be a power of two")
 
         self.size = size
-        self.max_order = int(math.log2(size))
+        self.max_order = size.bit_length() - 1
 
-        # Free lists: order -> list of block start addresses
-        self.free = {i: [] for i in range(self.max_order + 1)}
-        self.free[self.max_order].append(0)
+        # Free lists: order -> {block start address: None}
+        # (dicts as insertion-ordered sets: O(1) membership and removal,
+        #  popitem() hands out the most recently freed block first)
+        self.free = {i: {} for i in range(self.max_order + 1)}
+        self.free[self.max_order][0] = None
 
         # Allocated blocks: addr -> order
         self.used = {}
 
+        # Accounting
+        self.free_bytes = size
+        self.used_bytes = 0
+        self.internal_fragmentation = 0   # bytes lost to power-of-two rounding
+        self.failed_allocations = 0
+
+        self.probe = None                 # stats.instrument.Probe
+
     def malloc(self, request_size):
         if request_size <= 0:
+            self.failed_allocations += 1
             return None
 
         # Round UP to nearest power of two
-        order = math.ceil(math.log2(request_size))
+        order = (request_size - 1).bit_length()
+        got = self._take(order)
+        if got is None:
+            self.failed_allocations += 1
+            return None
 
-        # Find smallest free block that fits
-        for o in range(order, self.max_order + 1):
-            if self.free[o]:
-                addr = self.free[o].pop()
+        addr, splits = got
+        if self.probe is not None:
+            self.probe.record("buddy_splits", splits)
+        self.used_bytes += 1 << order
+        self.free_bytes -= 1 << order
+        self.internal_fragmentation += (1 << order) - request_size
+        return addr
+
+    def free_block(self, addr):
+        order = self.used.pop(addr, None)
+        if order is None:
+            return False
+
+        self.used_bytes -= 1 << order
+        self.free_bytes += 1 << order
+        merges = self._give(addr, order)
+        if self.probe is not None:
+            self.probe.record("buddy_merges", merges)
+        return True
 
-                # Split until we reach desired order
+    def _take(self, order):
+        # Smallest free block of at least `order`, split down to `order`
+        # and marked used -> (addr, splits), or None
+        free = self.free
+        for o in range(order, self.max_order + 1):
+            if free[o]:
+                addr = free[o].popitem()[0]
+                splits = o - order
                 while o > order:
                     o -= 1
-                    buddy = addr + (1 << o)
-                    self.free[o].append(buddy)
-
+                    free[o][addr + (1 << o)] = None
                 self.used[addr] = order
-                return addr
-
+                return addr, splits
         return None
 
-    def free_block(self, addr):
-        if addr not in self.used:
-            return False
-
-        order = self.used.pop(addr)
-
-        # Try recursive merging
-        while True:
+    def _give(self, addr, order):
+        # Return a block (already removed from `used`) to the free lists,
+        # merging with free buddies -> number of merges
+        free = self.free
+        start_order = order
+        while order < self.max_order:
             buddy = addr ^ (1 << order)
+            bucket = free[order]
 
-            if buddy in self.free[order]:
-                self.free[order].remove(buddy)
-                addr = min(addr, buddy)
-                order += 1
-            else:
+            if buddy not in bucket:
                 break
 
-        self.free[order].append(addr)
-        return True
+            del bucket[buddy]
+            addr &= ~(1 << order)
+            order += 1
+
+        free[order][addr] = None
+        return order - start_order
+
+    def largest_free(self):
+        # O(max_order) scan from the largest order down
+        for order in range(self.max_order, -1, -1):
+            if self.free[order]:
+                return 1 << order
+        return 0
+
+    # ---------- Batch / trace replay ----------
+    def replay(self, ops):
+        # ops: iterable of ("malloc", size) / ("free", addr)
+        # Returns array('q'): address or -1 per malloc, 1 / 0 per free
+        # (batches are not instrumented per operation). Operations are
+        # checked before any is applied, so a bad one changes nothing.
+        ops = list(ops)
+        for op, _ in ops:
+            if op != "malloc" and op != "free":
+                raise ValueError(f"Unknown buddy operation: {op!r}")
+
+        take = self._take
+        give = self._give
+        used = self.used
+        results = array("q")
+        emit = results.append
+        wasted = 0
+        failures = 0
+        allocated = 0
+
+        try:
+            for op, value in ops:
+                if op == "malloc":
+                    got = None
+                    if value > 0:
+                        order = (value - 1).bit_length()
+                        got = take(order)
+                    if got is None:
+                        failures += 1
+                        emit(-1)
+                    else:
+                        allocated += 1 << order
+                        wasted += (1 << order) - value
+                        emit(got[0])
+
+                else:
+                    order = used.pop(value, None)
+                    if order is None:
+                        emit(0)
+                    else:
+                        allocated -= 1 << order
+                        give(value, order)
+                        emit(1)
+        finally:
+            # Also when a value is not an int: what was applied is counted
+            self.internal_fragmentation += wasted
+            self.failed_allocations += failures
+            self.used_bytes += allocated
+            self.free_bytes -= allocated
+        return results
+
+    def malloc_many(self, sizes):
+        return self.replay(("malloc", s) for s in sizes)
+
+    def free_many(self, addrs):
+        return self.replay(("free", a) for a in addrs)
@@ -1,70 +1,102 @@
-import math
-from src.cache.cache_line import CacheLine
+from array import array
+from itertools import islice
+
+from src.cache.cache_set import CacheSets
+from src.cache.fifo import FIFO
+from src.cache.lfu import LFU
+from src.cache.lru import LRU
+from src.cache.plru import TreePLRU
+from src.cache.random_policy import RandomPolicy
+
+
+# Accesses decomposed at a time by access_batch
+BATCH_CHUNK = 1 << 16
+
+POLICIES = {
+    "FIFO": FIFO,
+    "LRU": LRU,
+    "LFU": LFU,
+    "RANDOM": RandomPolicy,
+    "PLRU": TreePLRU,
+}
+
+
+def make_policy(policy):
+    # Policy name ("LRU", "FIFO", ...) or ReplacementPolicy instance
+    if isinstance(policy, str):
+        try:
+            return POLICIES[policy.upper()]()
+        except KeyError:
+            raise ValueError(f"Unknown replacement policy: {policy!r}") from None
+    return policy
+
+
+def _is_power_of_two(n):
+    return n > 0 and n & (n - 1) == 0
+
 
 class CacheLevel:
+    timed_methods = {"access": "cache_access_ns"}
+
     def __init__(self, name, cache_size, block_size, associativity, policy):
         self.name = name
         self.cache_size = cache_size
         self.block_size = block_size
         self.associativity = associativity
-        self.policy = policy  # "FIFO" or "LRU"
 
         self.num_blocks = cache_size // block_size
         self.num_sets = self.num_blocks // associativity
 
-        self.offset_bits = int(math.log2(block_size))
-        self.set_bits = int(math.log2(self.num_sets))
+        if not (_is_power_of_two(block_size) and _is_power_of_two(self.num_sets)):
+            raise ValueError("Cache block size and set count must be powers of two")
+
+        self.offset_bits = block_size.bit_length() - 1
+        self.set_bits = self.num_sets.bit_length() - 1
+        self.set_mask = self.num_sets - 1
+
+        self.policy = make_policy(policy)
+        self.policy.bind(self.num_sets, associativity)
 
-        self.sets = [
-            [CacheLine() for _ in range(associativity)]
-            for _ in range(self.num_sets)
-        ]
+        # Flat line state, line index = set_index * associativity + way
+        lines = self.num_sets * associativity
+        self.valid = bytearray(lines)
+        self.tags = array("q", [-1]) * lines
+
+        # Resident block address -> line index
+        self.lookup = {}
 
         self.time = 0
         self.hits = 0
         self.misses = 0
 
+        self.probe = None   # stats.instrument.Probe
+
+    @property
+    def sets(self):
+        return CacheSets(self)
+
     def access(self, address):
         self.time += 1
 
-        block_addr = address // self.block_size
-        set_index = block_addr % self.num_sets
-        tag = block_addr // self.num_sets
-
-        cache_set = self.sets[set_index]
+        block_addr = address >> self.offset_bits
+        set_index = block_addr & self.set_mask
 
         # HIT
-        for line in cache_set:
-            if line.valid and line.tag == tag:
-                self.hits += 1
-                line.last_used = self.time
-                return {
-                    "hit": True,
-                    "set": set_index,
-                    "evicted": False
-                }
+        line = self.lookup.get(block_addr)
+        if line is not None:
+            self.hits += 1
+            self.policy.on_hit(set_index, line - set_index * self.associativity)
+            if self.probe is not None:
+                self.probe.record("ways_probed", 1)
+            return {
+                "hit": True,
+                "set": set_index,
+                "evicted": False
+            }
 
         # MISS
         self.misses += 1
-
-        victim = None
-        for line in cache_set:
-            if not line.valid:
-                victim = line
-                break
-
-        evicted = False
-        if victim is None:
-            evicted = True
-            if self.policy == "LRU":
-                victim = min(cache_set, key=lambda l: l.last_used)
-            else:
-                victim = min(cache_set, key=lambda l: l.insert_time)
-
-        victim.valid = True
-        victim.tag = tag
-        victim.last_used = self.time
-        victim.insert_time = self.time
+        evicted = self._fill(block_addr, set_index)
 
         return {
             "hit": False,
@@ -72,3 +104,111 @@ class CacheLevel:
             "evicted": evicted
         }
 
+    def _fill(self, block_addr, set_index):
+        base = set_index * self.associativity
+
+        line = self.valid.find(0, base, base + self.associativity)
+        evicted = line < 0
+        if self.probe is not None:
+            # Ways scanned for a free line
+            self.probe.record("ways_probed", self.associativity if evicted else line - base + 1)
+        if evicted:
+            line = base + self.policy.victim(set_index)
+            del self.lookup[(self.tags[line] << self.set_bits) | set_index]
+
+        self.valid[line] = 1
+        self.tags[line] = block_addr >> self.set_bits
+        self.lookup[block_addr] = line
+        self.policy.on_fill(set_index, line - base)
+        return evicted
+
+    def access_batch(self, addresses):
+        # addresses: any iterable / buffer of ints (list, array, memoryview,
+        # NumPy array). Returns per-access hit and eviction flags.
+        # With a probe, ways probed are recorded per access as in access()
+        # Addresses are split into block / set / tag arrays BATCH_CHUNK at a
+        # time (vectorized for NumPy input, walked through memoryviews), so
+        # the temporaries stay bounded however long the trace is.
+        offset_bits = self.offset_bits
+        set_bits = self.set_bits
+        set_mask = self.set_mask
+        hit_flags = bytearray()
+        evicted_flags = bytearray()
+
+        if hasattr(addresses, "dtype"):
+            for start in range(0, len(addresses), BATCH_CHUNK):
+                blocks = addresses[start:start + BATCH_CHUNK].astype("int64") >> offset_bits
+                self._access_blocks(
+                    memoryview(blocks), memoryview(blocks & set_mask),
+                    memoryview(blocks >> set_bits), hit_flags, evicted_flags
+                )
+        else:
+            it = iter(addresses)
+            while True:
+                blocks = array("q", [a >> offset_bits for a in islice(it, BATCH_CHUNK)])
+                if not blocks:
+                    break
+                self._access_blocks(
+                    blocks, array("q", [b & set_mask for b in blocks]),
+                    array("q", [b >> set_bits for b in blocks]), hit_flags, evicted_flags
+                )
+
+        return {
+            "hit": hit_flags,
+            "evicted": evicted_flags,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def _access_blocks(self, blocks, sets, block_tags, hit_flags, evicted_flags):
+        # One chunk of access_batch: block address, set index and tag per
+        # access; appends the chunk's flags
+        n = len(blocks)
+        hit = bytearray(n)
+        evicted = bytearray(n)
+
+        lookup = self.lookup
+        tags = self.tags
+        valid = self.valid
+        on_hit = self.policy.on_hit
+        on_fill = self.policy.on_fill
+        victim = self.policy.victim
+        set_bits = self.set_bits
+        ways = self.associativity
+        probe = self.probe
+        hits = 0
+
+        for i in range(n):
+            block_addr = blocks[i]
+            set_index = sets[i]
+
+            # HIT
+            line = lookup.get(block_addr)
+            if line is not None:
+                hits += 1
+                hit[i] = 1
+                on_hit(set_index, line - set_index * ways)
+                if probe is not None:
+                    probe.record("ways_probed", 1)
+                continue
+
+            # MISS
+            base = set_index * ways
+            line = valid.find(0, base, base + ways)
+            if probe is not None:
+                probe.record("ways_probed", ways if line < 0 else line - base + 1)
+            if line < 0:
+                evicted[i] = 1
+                line = base + victim(set_index)
+                del lookup[(tags[line] << set_bits) | set_index]
+
+            valid[line] = 1
+            tags[line] = block_tags[i]
+            lookup[block_addr] = line
+            on_fill(set_index, line - base)
+
+        self.time += n
+        self.hits += hits
+        self.misses += n - hits
+        hit_flags += hit
+        evicted_flags += evicted
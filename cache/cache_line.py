@@ -1,6 +1,8 @@
 class CacheLine:
-    def __init__(self):
-        self.valid = False
-        self.tag = None
-        self.last_used = 0   # for LRU
-        self.insert_time = 0 # for FIFO
+    __slots__ = ("valid", "tag", "last_used", "insert_time")
+
+    def __init__(self, valid=False, tag=None, last_used=0, insert_time=0):
+        self.valid = valid
+        self.tag = tag
+        self.last_used = last_used     # for LRU
+        self.insert_time = insert_time # for FIFO
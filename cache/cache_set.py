@@ -1,3 +1,44 @@
+from src.cache.cache_line import CacheLine
+
+
 class CacheSet:
-    def __init__(self, associativity):
-        self.lines = [None] * associativity
+    # Read-only view of one set of a CacheLevel's flat line arrays
+    def __init__(self, level, index):
+        self.level = level
+        self.index = index
+
+    @property
+    def lines(self):
+        level = self.level
+        base = self.index * level.associativity
+        out = []
+        for line in range(base, base + level.associativity):
+            valid = bool(level.valid[line])
+            out.append(CacheLine(valid, level.tags[line] if valid else None))
+        return out
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __len__(self):
+        return self.level.associativity
+
+
+class CacheSets:
+    # Sequence of CacheSet views, built on demand
+    def __init__(self, level):
+        self.level = level
+
+    def __len__(self):
+        return self.level.num_sets
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.level.num_sets
+        if not 0 <= index < self.level.num_sets:
+            raise IndexError("cache set index out of range")
+        return CacheSet(self.level, index)
+
+    def __iter__(self):
+        for i in range(self.level.num_sets):
+            yield CacheSet(self.level, i)
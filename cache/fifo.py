@@ -1,6 +1,63 @@
+from array import array
 
-from cache_line import CacheLine
+from src.cache.replacement_policy import ReplacementPolicy
 
-class FIFO:
-    def __init__(self):
-        self.line = CacheLine()
+class FIFO(ReplacementPolicy):
+    name = "FIFO"
+
+    def bind(self, num_sets, ways):
+        super().bind(num_sets, ways)
+        lines = num_sets * ways
+
+        # One doubly linked queue of resident lines per set, in fill order
+        # (oldest at head, -1 terminates), threaded through flat per-line
+        # arrays like LRU's recency lists. Hits do not move a line.
+        self.prev = array("q", [-1]) * lines
+        self.next = array("q", [-1]) * lines
+        self.head = array("q", [-1]) * num_sets
+        self.tail = array("q", [-1]) * num_sets
+
+    def _unlink(self, set_index, line):
+        prev = self.prev
+        nxt = self.next
+        p = prev[line]
+        n = nxt[line]
+        if p < 0:
+            self.head[set_index] = n
+        else:
+            nxt[p] = n
+        if n < 0:
+            self.tail[set_index] = p
+        else:
+            prev[n] = p
+        prev[line] = -1
+        nxt[line] = -1
+
+    def on_fill(self, set_index, way):
+        line = set_index * self.ways + way
+        if self.prev[line] >= 0 or self.head[set_index] == line:
+            # Refilling the victim: it leaves the queue head first
+            self._unlink(set_index, line)
+
+        # Push back
+        tail = self.tail[set_index]
+        self.prev[line] = tail
+        if tail < 0:
+            self.head[set_index] = line
+        else:
+            self.next[tail] = line
+        self.tail[set_index] = line
+
+    def on_invalidate(self, set_index, way):
+        line = set_index * self.ways + way
+        if self.prev[line] >= 0 or self.head[set_index] == line:
+            self._unlink(set_index, line)
+
+    def victim(self, set_index):
+        return self.head[set_index] - set_index * self.ways
+
+    def get_state(self):
+        return self.prev, self.next, self.head, self.tail
+
+    def set_state(self, state):
+        self.prev, self.next, self.head, self.tail = state
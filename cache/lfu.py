@@ -1,2 +1,96 @@
 
-from cache_line import CacheLine
+from array import array
+
+from src.cache.replacement_policy import ReplacementPolicy
+
+class LFU(ReplacementPolicy):
+    name = "LFU"
+
+    def bind(self, num_sets, ways):
+        super().bind(num_sets, ways)
+        self.counts = array("q", [0]) * (num_sets * ways)
+
+        # Frequency buckets, created lazily per set:
+        # set_index -> {count: {line: None}} (insertion order = recency,
+        # so ties on the lowest count evict the least recently used line)
+        self.buckets = {}
+        self.min_count = array("q", [0]) * num_sets
+
+    def on_hit(self, set_index, way):
+        line = set_index * self.ways + way
+        count = self.counts[line]
+        buckets = self.buckets[set_index]
+
+        bucket = buckets[count]
+        del bucket[line]
+        if not bucket:
+            del buckets[count]
+            if self.min_count[set_index] == count:
+                self.min_count[set_index] = count + 1
+
+        count += 1
+        self.counts[line] = count
+        bucket = buckets.get(count)
+        if bucket is None:
+            bucket = buckets[count] = {}
+        bucket[line] = None
+
+    def on_fill(self, set_index, way):
+        line = set_index * self.ways + way
+        buckets = self.buckets.get(set_index)
+        if buckets is None:
+            buckets = self.buckets[set_index] = {}
+
+        self.counts[line] = 1
+        bucket = buckets.get(1)
+        if bucket is None:
+            bucket = buckets[1] = {}
+        bucket[line] = None
+        self.min_count[set_index] = 1
+
+    def on_invalidate(self, set_index, way):
+        line = set_index * self.ways + way
+        buckets = self.buckets[set_index]
+        count = self.counts[line]
+
+        bucket = buckets[count]
+        del bucket[line]
+        if not bucket:
+            del buckets[count]
+
+    def victim(self, set_index):
+        buckets = self.buckets[set_index]
+        count = self.min_count[set_index]
+        bucket = buckets[count]
+
+        line = next(iter(bucket))
+        del bucket[line]
+        if not bucket:
+            del buckets[count]
+        return line - set_index * self.ways
+
+    def get_state(self):
+        # Buckets flattened to parallel (set, count, line) arrays, in
+        # bucket order so recency ties survive a restore
+        sets = array("q")
+        counts = array("q")
+        lines = array("q")
+        for set_index, buckets in self.buckets.items():
+            for count, bucket in buckets.items():
+                for line in bucket:
+                    sets.append(set_index)
+                    counts.append(count)
+                    lines.append(line)
+        return self.counts, self.min_count, sets, counts, lines
+
+    def set_state(self, state):
+        self.counts, self.min_count, sets, counts, lines = state
+        self.buckets = {}
+        for set_index, count, line in zip(sets, counts, lines):
+            buckets = self.buckets.get(set_index)
+            if buckets is None:
+                buckets = self.buckets[set_index] = {}
+            bucket = buckets.get(count)
+            if bucket is None:
+                bucket = buckets[count] = {}
+            bucket[line] = None
@@ -1,8 +1,57 @@
 
-from cache_line import CacheLine
-import time
+from array import array
 
-class LRU(CacheLine):
-    def __init__(self):
-        super().__init__()
-        self.time = time.time()
+from src.cache.replacement_policy import ReplacementPolicy
+
+class LRU(ReplacementPolicy):
+    name = "LRU"
+
+    def bind(self, num_sets, ways):
+        super().bind(num_sets, ways)
+        lines = num_sets * ways
+
+        # One doubly linked recency list per set, threaded through flat
+        # per-line arrays (MRU at head, LRU at tail, -1 terminates)
+        self.prev = array("q", range(-1, lines - 1))
+        self.next = array("q", range(1, lines + 1))
+        for base in range(0, lines, ways):
+            self.prev[base] = -1
+            self.next[base + ways - 1] = -1
+
+        self.head = array("q", range(0, lines, ways))
+        self.tail = array("q", range(ways - 1, lines, ways))
+
+    def on_hit(self, set_index, way):
+        line = set_index * self.ways + way
+        head = self.head[set_index]
+        if line == head:
+            return
+
+        prev = self.prev
+        nxt = self.next
+
+        # Unlink
+        p = prev[line]
+        n = nxt[line]
+        nxt[p] = n
+        if n < 0:
+            self.tail[set_index] = p
+        else:
+            prev[n] = p
+
+        # Push front
+        prev[line] = -1
+        nxt[line] = head
+        prev[head] = line
+        self.head[set_index] = line
+
+    on_fill = on_hit
+
+    def victim(self, set_index):
+        return self.tail[set_index] - set_index * self.ways
+
+    def get_state(self):
+        return self.prev, self.next, self.head, self.tail
+
+    def set_state(self, state):
+        self.prev, self.next, self.head, self.tail = state
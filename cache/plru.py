@@ -0,0 +1,53 @@
+
+from array import array
+
+from src.cache.replacement_policy import ReplacementPolicy
+
+class TreePLRU(ReplacementPolicy):
+    name = "PLRU"
+
+    def bind(self, num_sets, ways):
+        if ways & (ways - 1) != 0:
+            raise ValueError("Tree PLRU needs a power-of-two associativity")
+        super().bind(num_sets, ways)
+        self.depth = ways.bit_length() - 1
+
+        # One int per set; bit n is tree node n (root = 1, children 2n, 2n+1),
+        # 0 = the pseudo-LRU side is left, 1 = it is right
+        self.bits = [0] * num_sets
+
+    def on_hit(self, set_index, way):
+        bits = self.bits[set_index]
+        node = 1
+        for level in range(self.depth - 1, -1, -1):
+            went_right = (way >> level) & 1
+            # Point this node away from the way just used
+            if went_right:
+                bits &= ~(1 << node)
+            else:
+                bits |= 1 << node
+            node = 2 * node + went_right
+        self.bits[set_index] = bits
+
+    on_fill = on_hit
+
+    def victim(self, set_index):
+        bits = self.bits[set_index]
+        node = 1
+        for _ in range(self.depth):
+            node = 2 * node + ((bits >> node) & 1)
+        return node - self.ways
+
+    def get_state(self):
+        # Node bits are below bit `ways`: a fixed number of little-endian
+        # bytes per set, so any associativity fits
+        width = (self.ways + 7) // 8
+        return (array("B", b"".join(bits.to_bytes(width, "little") for bits in self.bits)),)
+
+    def set_state(self, state):
+        width = (self.ways + 7) // 8
+        data = state[0].tobytes()
+        self.bits = [
+            int.from_bytes(data[i:i + width], "little")
+            for i in range(0, len(data), width)
+        ]
@@ -0,0 +1,27 @@
+
+import math
+import random
+from array import array
+
+from src.cache.replacement_policy import ReplacementPolicy
+
+class RandomPolicy(ReplacementPolicy):
+    name = "RANDOM"
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+
+    def victim(self, set_index):
+        return self.rng.randrange(self.ways)
+
+    def get_state(self):
+        version, internal, gauss_next = self.rng.getstate()
+        return (
+            array("q", (version,) + internal),
+            array("d", [math.nan if gauss_next is None else gauss_next]),
+        )
+
+    def set_state(self, state):
+        ints, gauss = state
+        gauss_next = None if math.isnan(gauss[0]) else gauss[0]
+        self.rng.setstate((ints[0], tuple(ints[1:]), gauss_next))
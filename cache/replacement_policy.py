@@ -0,0 +1,31 @@
+
+
+class ReplacementPolicy:
+    # Per-set replacement state for a cache with `num_sets` sets of `ways`
+    # lines each. The cache fills invalid ways itself and only asks for a
+    # victim once a set is full; every operation must be O(1).
+    name = None
+
+    def bind(self, num_sets, ways):
+        self.num_sets = num_sets
+        self.ways = ways
+
+    def on_hit(self, set_index, way):
+        pass
+
+    def on_fill(self, set_index, way):
+        pass
+
+    def on_invalidate(self, set_index, way):
+        pass
+
+    def victim(self, set_index):
+        raise NotImplementedError
+
+    # Checkpointing (engine.checkpoint): the replacement state as a tuple
+    # of arrays, and back. Called after bind() on the restoring side.
+    def get_state(self):
+        return ()
+
+    def set_state(self, state):
+        pass
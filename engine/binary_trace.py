@@ -0,0 +1,168 @@
+import mmap
+import struct
+import sys
+from array import array
+
+from src.engine.trace_reader import (
+    DEFAULT_CHUNK_SIZE, OP_READ, chunks_from_ops, read_text_trace
+)
+
+# File layout: 16-byte header, then fixed-width little-endian records of
+# three int64 fields: (op code, address or size, allocation id)
+MAGIC = b"MMSTRACE"
+VERSION = 1
+HEADER = struct.Struct("<8sII")       # magic, version, record size
+FIELDS = 3
+RECORD_SIZE = FIELDS * 8
+
+_NATIVE_LITTLE = sys.byteorder == "little"
+
+
+def is_binary_trace(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class BinaryTraceWriter:
+    def __init__(self, path, buffer_records=DEFAULT_CHUNK_SIZE):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE))
+        self.buffer = array("q")
+        self.buffer_records = buffer_records
+        self.records = 0
+
+    def write(self, op, value, block_id=-1):
+        self.buffer.extend((op, value, block_id))
+        self.records += 1
+        if len(self.buffer) >= self.buffer_records * FIELDS:
+            self.flush()
+
+    def write_chunk(self, ops, values, ids):
+        for record in zip(ops, values, ids):
+            self.buffer.extend(record)
+        self.records += len(ops)
+        if len(self.buffer) >= self.buffer_records * FIELDS:
+            self.flush()
+
+    def flush(self):
+        if not _NATIVE_LITTLE:
+            self.buffer.byteswap()
+        self.buffer.tofile(self.file)
+        self.buffer = array("q")
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_binary_trace(path, ops):
+    # ops: iterable of (op, value) / (op, value, id) tuples
+    with BinaryTraceWriter(path) as writer:
+        for chunk in chunks_from_ops(ops):
+            writer.write_chunk(*chunk)
+        return writer.records
+
+
+def convert_text_trace(src, dst, chunk_size=DEFAULT_CHUNK_SIZE):
+    with BinaryTraceWriter(dst, chunk_size) as writer:
+        for chunk in read_text_trace(src, chunk_size):
+            writer.write_chunk(*chunk)
+        return writer.records
+
+
+class BinaryTrace:
+    # Read-only, memory-mapped view of a binary trace. `ops`, `values` and
+    # `ids` are strided memoryviews straight over the mapping; nothing is
+    # copied or converted to Python ints until it is indexed.
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            header = self.file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path}: not a binary trace")
+            magic, version, record_size = HEADER.unpack(header)
+            if magic != MAGIC or record_size != RECORD_SIZE:
+                raise ValueError(f"{path}: not a binary trace")
+            if version != VERSION:
+                raise ValueError(f"{path}: unsupported trace version {version}")
+
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.file.close()
+            raise
+
+        body = memoryview(self.mmap)[HEADER.size:]
+        usable = len(body) - len(body) % RECORD_SIZE
+        body = body[:usable]
+        if _NATIVE_LITTLE:
+            self.records = body.cast("q")
+        else:
+            # Big-endian host: one byteswapped copy instead of a view
+            records = array("q", body.tobytes())
+            records.byteswap()
+            self.records = memoryview(records)
+            body.release()
+
+        self.ops = self.records[0::FIELDS]
+        self.values = self.records[1::FIELDS]
+        self.ids = self.records[2::FIELDS]
+
+    def __len__(self):
+        return len(self.ops)
+
+    def chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        # (ops, values, ids) views, ready for TraceSimulator.run; each chunk
+        # is released when the next one is requested or the generator is
+        # closed
+        for start in range(0, len(self), chunk_size):
+            end = start + chunk_size
+            chunk = (self.ops[start:end], self.values[start:end], self.ids[start:end])
+            try:
+                yield chunk
+            finally:
+                for view in chunk:
+                    view.release()
+
+    def address_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        # Addresses of READ / WRITE records, for CacheLevel.access_batch
+        # and VirtualMemoryManager.access_batch
+        for ops, values, _ in self.chunks(chunk_size):
+            yield array("q", (v for op, v in zip(ops, values) if op >= OP_READ))
+
+    def as_numpy(self):
+        # Zero-copy (n, 3) int64 array; needs NumPy, and the array must be
+        # dropped before close()
+        import numpy as np
+        return np.frombuffer(
+            self.mmap, dtype="<i8", count=len(self) * FIELDS, offset=HEADER.size
+        ).reshape(-1, FIELDS)
+
+    def close(self):
+        for view in (self.ops, self.values, self.ids, self.records):
+            view.release()
+        self.mmap.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_trace(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Chunks from either trace format
+    if not is_binary_trace(path):
+        yield from read_text_trace(path, chunk_size)
+        return
+    with BinaryTrace(path) as trace:
+        yield from trace.chunks(chunk_size)
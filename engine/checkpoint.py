@@ -0,0 +1,387 @@
+import struct
+import sys
+from array import array
+from collections import OrderedDict, deque
+from itertools import compress
+
+from src.allocator.block import Block
+from src.allocator.physical_memory import PhysicalMemory
+from src.buddy.buddy_allocator import BuddyAllocator
+from src.cache.cache_level import CacheLevel, make_policy
+from src.virtual_memory.page_table import PageTable
+from src.virtual_memory.tlb import TLB
+from src.virtual_memory.vm_manager import VirtualMemoryManager
+
+# Checkpoint file layout (little-endian):
+#   header  : magic, version, model kind
+#   sections: typecode, item size, item count, then the raw array bytes
+# Every piece of model state is stored as whole arrays, so saving and
+# loading is a handful of tobytes() / frombytes() calls plus rebuilding
+# the derived indexes (lookup dicts, free index, page table).
+# Probes and recorders are not part of a checkpoint.
+MAGIC = b"MMSSTATE"
+VERSION = 1
+HEADER = struct.Struct("<8sII")       # magic, version, model kind
+SECTION = struct.Struct("<cBQ")       # typecode, item size, item count
+
+KIND_MEMORY = 1
+KIND_BUDDY = 2
+KIND_CACHE = 3
+KIND_VM = 4
+
+_NATIVE_LITTLE = sys.byteorder == "little"
+_FIXED_WIDTH = {"l": "q", "L": "Q"}
+
+VM_POLICY_CODES = {"FIFO": 0, "LRU": 1, "CLOCK": 2, "OPT": 3}
+
+
+# ---------- Sections ----------
+class _Writer:
+    def __init__(self, kind):
+        self.parts = [HEADER.pack(MAGIC, VERSION, kind)]
+
+    def put(self, values, typecode="q"):
+        if isinstance(values, (bytes, bytearray)):
+            values = array("B", values)
+        elif not isinstance(values, array):
+            values = array(typecode, values)
+        elif values.typecode in _FIXED_WIDTH:
+            # C long differs between platforms; store it as 64-bit
+            values = array(_FIXED_WIDTH[values.typecode], values)
+        elif not _NATIVE_LITTLE:
+            values = array(values.typecode, values)
+        if not _NATIVE_LITTLE:
+            values.byteswap()
+
+        self.parts.append(
+            SECTION.pack(values.typecode.encode(), values.itemsize, len(values))
+        )
+        self.parts.append(values.tobytes())
+
+    def text(self, value):
+        self.put(value.encode())
+
+    def policy(self, policy):
+        if policy.name is None:
+            raise ValueError(f"{type(policy).__name__} has no name to checkpoint it by")
+        self.text(policy.name)
+        state = policy.get_state()
+        self.put([len(state)])
+        for values in state:
+            self.put(values)
+
+    def getvalue(self):
+        return b"".join(self.parts)
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        if len(self.data) < HEADER.size:
+            raise ValueError("not a checkpoint")
+        magic, version, self.kind = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError("not a checkpoint")
+        if version != VERSION:
+            raise ValueError(f"unsupported checkpoint version {version}")
+        self.offset = HEADER.size
+
+    def get(self):
+        typecode, itemsize, count = SECTION.unpack_from(self.data, self.offset)
+        typecode = typecode.decode()
+        self.offset += SECTION.size
+
+        values = array(typecode)
+        if values.itemsize != itemsize:
+            raise ValueError(
+                f"checkpoint array {typecode!r} has {itemsize}-byte items, "
+                f"this platform uses {values.itemsize}"
+            )
+        end = self.offset + itemsize * count
+        values.frombytes(self.data[self.offset:end])
+        if not _NATIVE_LITTLE:
+            values.byteswap()
+        self.offset = end
+        return values
+
+    def bytes(self):
+        return bytearray(self.get())
+
+    def text(self):
+        return self.get().tobytes().decode()
+
+    def policy(self):
+        # Bound by the model constructor, then given the saved state
+        policy = make_policy(self.text())
+        count = self.get()[0]
+        return policy, tuple(self.get() for _ in range(count))
+
+
+# ---------- PhysicalMemory ----------
+def _dump_memory(memory, out):
+    # Blocks tile memory, so sizes and ids (-1 = free) describe the chain
+    sizes = array("q")
+    ids = array("q")
+    b = memory.head
+    while b is not None:
+        sizes.append(b.size)
+        ids.append(-1 if b.free else b.block_id)
+        b = b.next
+
+    # Free block starts in segregated-list order (TLSF tie-breaking)
+    segregated = array("q")
+    for bucket in memory.free_index.segregated.lists.values():
+        segregated.extend(bucket)
+
+    out.put([memory.size, memory.next_id])
+    out.put(sizes)
+    out.put(ids)
+    out.put(segregated)
+
+
+def _load_memory(reader):
+    size, next_id = reader.get()
+    sizes = reader.get()
+    ids = reader.get()
+    segregated = reader.get()
+
+    memory = PhysicalMemory(size)
+    memory.next_id = next_id
+
+    by_id = {}
+    free_blocks = {}
+    used_bytes = 0
+    head = prev = None
+    start = 0
+    for block_size, block_id in zip(sizes, ids):
+        if block_id < 0:
+            block = Block(start, block_size)
+            free_blocks[start] = block
+        else:
+            block = Block(start, block_size, False, block_id)
+            by_id[block_id] = block
+            used_bytes += block_size
+
+        if prev is None:
+            head = block
+        else:
+            prev.next = block
+            block.prev = prev
+        prev = block
+        start += block_size
+
+    if start != size:
+        raise ValueError("checkpoint blocks do not cover the memory")
+
+    memory.head = head
+    memory.by_id = by_id
+    memory.used_bytes = used_bytes
+    memory.free_bytes = size - used_bytes
+    memory.free_index.build(free_blocks[s] for s in segregated)
+    return memory
+
+
+# ---------- BuddyAllocator ----------
+def _dump_buddy(buddy, out):
+    out.put([buddy.size, buddy.internal_fragmentation, buddy.failed_allocations])
+    out.put(buddy.used.keys())
+    out.put(buddy.used.values())
+
+    # Free lists keep their insertion order: popitem() is LIFO
+    out.put(len(buddy.free[o]) for o in range(buddy.max_order + 1))
+    out.put(addr for o in range(buddy.max_order + 1) for addr in buddy.free[o])
+
+
+def _load_buddy(reader):
+    size, internal_fragmentation, failed_allocations = reader.get()
+    used_addrs = reader.get()
+    used_orders = reader.get()
+    free_counts = reader.get()
+    free_addrs = reader.get()
+
+    buddy = BuddyAllocator(size)
+    buddy.internal_fragmentation = internal_fragmentation
+    buddy.failed_allocations = failed_allocations
+
+    buddy.used = dict(zip(used_addrs, used_orders))
+    buddy.used_bytes = sum(1 << order for order in used_orders)
+    buddy.free_bytes = size - buddy.used_bytes
+
+    pos = 0
+    for order, count in enumerate(free_counts):
+        buddy.free[order] = dict.fromkeys(free_addrs[pos:pos + count])
+        pos += count
+    return buddy
+
+
+# ---------- CacheLevel ----------
+def _dump_cache(cache, out):
+    out.text(cache.name)
+    out.put([cache.cache_size, cache.block_size, cache.associativity,
+             cache.time, cache.hits, cache.misses])
+    out.put(cache.valid)
+    out.put(cache.tags)
+    out.policy(cache.policy)
+
+
+def _load_cache(reader):
+    name = reader.text()
+    cache_size, block_size, associativity, time, hits, misses = reader.get()
+    valid = reader.bytes()
+    tags = reader.get()
+    policy, state = reader.policy()
+
+    cache = CacheLevel(name, cache_size, block_size, associativity, policy)
+    cache.policy.set_state(state)
+    cache.time = time
+    cache.hits = hits
+    cache.misses = misses
+    cache.valid = valid
+    cache.tags = tags
+
+    # Resident block address -> line index
+    set_bits = cache.set_bits
+    cache.lookup = {
+        (tags[line] << set_bits) | (line // associativity): line
+        for line in compress(range(len(valid)), valid)
+    }
+    return cache
+
+
+# ---------- VirtualMemoryManager ----------
+def _dump_tlb(tlb, out):
+    out.put([tlb.entries, tlb.associativity, tlb.hits, tlb.misses])
+    out.put(tlb.valid)
+    out.put(tlb.pages)
+    out.put(tlb.frames)
+    out.policy(tlb.policy)
+
+
+def _load_tlb(reader):
+    entries, associativity, hits, misses = reader.get()
+    valid = reader.bytes()
+    pages = reader.get()
+    frames = reader.get()
+    policy, state = reader.policy()
+
+    tlb = TLB(entries, associativity, policy)
+    tlb.policy.set_state(state)
+    tlb.hits = hits
+    tlb.misses = misses
+    tlb.valid = valid
+    tlb.pages = pages
+    tlb.frames = frames
+    tlb.lookup = {pages[e]: e for e in compress(range(entries), valid)}
+    return tlb
+
+
+def _dump_vm(vm, out):
+    table = vm.page_table
+    out.put([
+        vm.page_size, vm.num_frames, VM_POLICY_CODES[vm.policy],
+        vm.accesses, vm.page_faults, vm.hand, vm.position,
+        table.page_bits, table.bits_per_level, table.peak_bytes,
+        vm.next_use is not None, vm.tlb is not None,
+    ])
+
+    # The page table is the inverse of the frame table
+    out.put(-1 if page is None else page for page in vm.frames)
+    out.put(vm.free_frames)
+    out.put(vm.replacement_queue)
+    out.put(vm.recency.keys())
+    out.put(vm.referenced)
+
+    out.put(vm.next_use if vm.next_use is not None else ())
+    out.put(vm.resident_next_use.keys())
+    out.put(vm.resident_next_use.values())
+
+    if vm.tlb is not None:
+        _dump_tlb(vm.tlb, out)
+
+
+def _load_vm(reader):
+    (page_size, num_frames, policy_code, accesses, page_faults, hand, position,
+     page_bits, bits_per_level, peak_bytes, has_next_use, has_tlb) = reader.get()
+    frames = reader.get()
+    free_frames = reader.get()
+    replacement_queue = reader.get()
+    recency = reader.get()
+    referenced = reader.bytes()
+    next_use = reader.get()
+    resident_pages = reader.get()
+    resident_next = reader.get()
+    tlb = _load_tlb(reader) if has_tlb else None
+
+    policy = next(name for name, code in VM_POLICY_CODES.items() if code == policy_code)
+    vm = VirtualMemoryManager(num_frames, page_size, policy, tlb=tlb)
+    vm.accesses = accesses
+    vm.page_faults = page_faults
+    vm.hand = hand
+    vm.position = position
+
+    vm.page_table = PageTable(page_bits, bits_per_level)
+    vm.frames = [None if page < 0 else page for page in frames]
+    for frame, page in enumerate(vm.frames):
+        if page is not None:
+            vm.page_table.map(page, frame)
+    vm.page_table.peak_bytes = max(vm.page_table.peak_bytes, peak_bytes)
+
+    vm.free_frames = deque(free_frames)
+    vm.replacement_queue = deque(replacement_queue)
+    vm.recency = OrderedDict.fromkeys(recency)
+    vm.referenced = referenced
+
+    # OPT: the heap is rebuilt without its stale entries
+    vm.next_use = next_use if has_next_use else None
+    vm.resident_next_use = dict(zip(resident_pages, resident_next))
+    vm.future = sorted((-nxt, page) for page, nxt in vm.resident_next_use.items())
+    return vm
+
+
+# ---------- Public API ----------
+_DUMPERS = (
+    (PhysicalMemory, KIND_MEMORY, _dump_memory),
+    (BuddyAllocator, KIND_BUDDY, _dump_buddy),
+    (CacheLevel, KIND_CACHE, _dump_cache),
+    (VirtualMemoryManager, KIND_VM, _dump_vm),
+)
+
+_LOADERS = {
+    KIND_MEMORY: _load_memory,
+    KIND_BUDDY: _load_buddy,
+    KIND_CACHE: _load_cache,
+    KIND_VM: _load_vm,
+}
+
+
+def dumps(model):
+    # PhysicalMemory, BuddyAllocator, CacheLevel or VirtualMemoryManager -> bytes
+    for cls, kind, dump in _DUMPERS:
+        if isinstance(model, cls):
+            out = _Writer(kind)
+            dump(model, out)
+            return out.getvalue()
+    raise TypeError(f"cannot checkpoint {type(model).__name__}")
+
+
+def loads(data):
+    # A fresh, independent model; load the same bytes several times to
+    # branch one warmed-up state into separate experiments
+    reader = _Reader(data)
+    try:
+        load = _LOADERS[reader.kind]
+    except KeyError:
+        raise ValueError(f"unknown checkpoint model kind {reader.kind}") from None
+    return load(reader)
+
+
+def save(model, path):
+    data = dumps(model)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
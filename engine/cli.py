@@ -0,0 +1,241 @@
+import argparse
+import json
+import sys
+
+from src.allocator.best_fit import BestFit
+from src.allocator.compaction import CompactingStrategy, Compactor
+from src.allocator.first_fit import FirstFit
+from src.allocator.physical_memory import PhysicalMemory
+from src.allocator.slab import SlabAllocator
+from src.allocator.tlsf import TLSF
+from src.allocator.worst_fit import WorstFit
+from src.buddy.buddy_allocator import BuddyAllocator
+from src.cache.cache_level import CacheLevel
+from src.engine.binary_trace import convert_text_trace, open_trace
+from src.engine.simulator import TraceSimulator
+from src.engine.sweep import sweep, write_table
+from src.stats.instrument import InstrumentedStrategy, Probe, instrument
+from src.stats.recorder import DEFAULT_METRICS, MetricsRecorder
+from src.stats.stack_distance import StackDistanceAnalyzer
+from src.engine.trace_reader import DEFAULT_CHUNK_SIZE, OP_READ, read_text_trace
+from src.virtual_memory.tlb import TLB
+from src.virtual_memory.vm_manager import POLICIES as VM_POLICIES, VirtualMemoryManager
+
+STRATEGIES = {
+    "first": FirstFit,
+    "best": BestFit,
+    "worst": WorstFit,
+    "tlsf": TLSF,
+}
+
+
+def parse_cache(spec):
+    # NAME:SIZE:BLOCK:ASSOC[:POLICY]
+    parts = spec.split(":")
+    if len(parts) not in (4, 5):
+        raise argparse.ArgumentTypeError(
+            f"cache spec {spec!r} is not NAME:SIZE:BLOCK:ASSOC[:POLICY]"
+        )
+    name, size, block, assoc = parts[:4]
+    policy = parts[4] if len(parts) == 5 else "LRU"
+    return CacheLevel(name, int(size), int(block), int(assoc), policy)
+
+
+def parse_geometry(spec):
+    # SIZE:BLOCK:ASSOC[:POLICY]
+    parts = spec.split(":")
+    if len(parts) not in (3, 4):
+        raise argparse.ArgumentTypeError(
+            f"cache geometry {spec!r} is not SIZE:BLOCK:ASSOC[:POLICY]"
+        )
+    return {
+        "cache_size": int(parts[0]),
+        "block_size": int(parts[1]),
+        "associativity": int(parts[2]),
+        "policy": parts[3] if len(parts) == 4 else "LRU",
+    }
+
+
+def parse_int_list(spec):
+    return [int(x) for x in spec.split(",") if x]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Run the memory simulator without the GUI."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="replay a text or binary trace")
+    run.add_argument("trace", help="trace file ('-' for a text trace on stdin)")
+    run.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    run.add_argument("--memory", type=int, help="physical memory size")
+    run.add_argument("--strategy", choices=sorted(STRATEGIES), default="first")
+    run.add_argument("--compact", action="store_true",
+                     help="compact physical memory when an allocation fails")
+    run.add_argument("--compact-step", type=int, metavar="BYTES",
+                     help="also compact incrementally, at most BYTES per allocation")
+
+    run.add_argument("--buddy", type=int, help="buddy heap size (power of two)")
+
+    run.add_argument("--slab", type=int,
+                     help="memory size for a slab allocator (over first fit)")
+    run.add_argument("--slab-size", type=int, default=4096)
+
+    run.add_argument("--frames", type=int, help="physical frames for paging")
+    run.add_argument("--page-size", type=int, default=64)
+    run.add_argument("--vm-policy", type=str.upper, choices=VM_POLICIES, default="FIFO",
+                     help="OPT reads the trace twice, so it needs a trace file")
+    run.add_argument("--tlb", type=int, help="TLB entries")
+    run.add_argument("--tlb-assoc", type=int, help="TLB associativity")
+
+    run.add_argument("--cache", type=parse_cache, action="append", default=[],
+                     metavar="NAME:SIZE:BLOCK:ASSOC[:POLICY]",
+                     help="cache level, repeat for L1, L2, ...")
+
+    run.add_argument("--instrument", action="store_true",
+                     help="report search lengths, splits/merges and latency histograms")
+
+    run.add_argument("--record-every", type=int,
+                     help="sample metrics every N operations")
+    run.add_argument("--record-capacity", type=int, default=4096,
+                     help="samples kept (oldest are overwritten)")
+    run.add_argument("--record-out", default="metrics.csv",
+                     help="CSV file for the sampled metrics")
+
+    sweep_cmd = commands.add_parser(
+        "sweep", help="run many cache / paging configurations in parallel"
+    )
+    sweep_cmd.add_argument("trace", help="text or binary trace")
+    sweep_cmd.add_argument("--cache", type=parse_geometry, action="append", default=[],
+                           metavar="SIZE:BLOCK:ASSOC[:POLICY]")
+    sweep_cmd.add_argument("--frames", type=parse_int_list, default=[],
+                           metavar="N,N,...", help="frame counts to try")
+    sweep_cmd.add_argument("--page-size", type=int, default=64)
+    sweep_cmd.add_argument("--vm-policy", default="FIFO",
+                           metavar="POLICY,POLICY,...")
+    sweep_cmd.add_argument("--workers", type=int, help="worker processes")
+    sweep_cmd.add_argument("--out", help="CSV output file (default: stdout)")
+    sweep_cmd.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    mrc = commands.add_parser(
+        "mrc", help="LRU miss-ratio curve for all capacities in one pass"
+    )
+    mrc.add_argument("trace", help="text or binary trace")
+    mrc.add_argument("--block-size", type=int, default=64,
+                     help="cache block or page size")
+    mrc.add_argument("--sets", type=int, default=1,
+                     help="cache sets (1 = fully associative / paging)")
+    mrc.add_argument("--capacities", type=parse_int_list,
+                     metavar="N,N,...", help="ways per set (frames when --sets 1)")
+    mrc.add_argument("--out", help="CSV output file (default: stdout)")
+
+    convert = commands.add_parser("convert", help="convert a text trace to binary")
+    convert.add_argument("src", help="text trace ('-' for stdin)")
+    convert.add_argument("dst", help="binary trace to write")
+    return parser
+
+
+def build_simulator(args):
+    memory = strategy = buddy = slab = vm = compactor = None
+
+    if args.memory:
+        memory = PhysicalMemory(args.memory)
+        strategy = STRATEGIES[args.strategy]()
+        if args.compact or args.compact_step:
+            compactor = Compactor(memory)
+            strategy = CompactingStrategy(strategy, compactor, args.compact_step)
+    if args.buddy:
+        buddy = BuddyAllocator(args.buddy)
+    if args.slab:
+        slab = SlabAllocator(PhysicalMemory(args.slab), FirstFit(), args.slab_size)
+    if args.frames:
+        tlb = TLB(args.tlb, args.tlb_assoc) if args.tlb else None
+        vm = VirtualMemoryManager(args.frames, args.page_size, args.vm_policy, tlb=tlb)
+
+    probe = None
+    if args.instrument:
+        probe = Probe()
+        if memory is not None:
+            instrument(memory, probe)
+            strategy = InstrumentedStrategy(strategy, probe)
+        for model in (buddy, slab, vm, *args.cache):
+            if model is not None:
+                instrument(model, probe)
+
+    recorder = None
+    if args.record_every:
+        recorder = MetricsRecorder(
+            DEFAULT_METRICS + ("buddy_fragmentation", "tlb_hit_rate"),
+            args.record_every, args.record_capacity
+        )
+
+    simulator = TraceSimulator(memory, strategy, buddy, vm, args.cache, recorder, slab)
+    simulator.probe = probe
+    simulator.compactor = compactor
+    return simulator
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        source = sys.stdin if args.src == "-" else args.src
+        records = convert_text_trace(source, args.dst)
+        print(f"{records} records written to {args.dst}")
+        return 0
+
+    if args.command == "sweep":
+        vm_configs = [
+            {"frames": frames, "page_size": args.page_size, "policy": policy}
+            for policy in args.vm_policy.split(",")
+            for frames in args.frames
+        ]
+        rows = sweep(args.trace, args.cache, vm_configs, args.workers, args.chunk_size)
+        if args.out:
+            with open(args.out, "w", newline="") as f:
+                write_table(rows, f)
+        else:
+            write_table(rows, sys.stdout)
+        return 0
+
+    if args.command == "mrc":
+        analyzer = StackDistanceAnalyzer(args.block_size, args.sets)
+        for ops, values, _ in open_trace(args.trace):
+            analyzer.feed(v for op, v in zip(ops, values) if op >= OP_READ)
+        rows = analyzer.miss_ratio_curve(args.capacities)
+        if args.out:
+            with open(args.out, "w", newline="") as f:
+                write_table(rows, f)
+        else:
+            write_table(rows, sys.stdout)
+        return 0
+
+    if args.frames and args.vm_policy == "OPT" and args.trace == "-":
+        parser.error("--vm-policy OPT needs a trace file, not stdin")
+
+    simulator = build_simulator(args)
+    if simulator.vm is not None and args.vm_policy == "OPT":
+        # Offline OPT: one pass for the future accesses, as in sweep
+        simulator.vm.load_trace(
+            v
+            for ops, values, _ in open_trace(args.trace, args.chunk_size)
+            for op, v in zip(ops, values) if op >= OP_READ
+        )
+
+    if args.trace == "-":
+        chunks = read_text_trace(sys.stdin, args.chunk_size)
+    else:
+        chunks = open_trace(args.trace, args.chunk_size)
+    summary = simulator.run(chunks)
+    if simulator.probe is not None:
+        summary["instrumentation"] = simulator.probe.summary()
+    if simulator.recorder is not None:
+        simulator.recorder.to_csv(args.record_out)
+
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
@@ -0,0 +1,212 @@
+from array import array
+
+from src.engine.trace_reader import NO_ID, OP_FREE, OP_MALLOC
+from src.stats.tracker import StatsTracker
+
+
+class TraceSimulator:
+    # Drives the models with trace chunks (see engine.trace_reader).
+    # Only the currently live allocations are remembered, so memory use
+    # does not grow with the trace length. Sizes <= 0 (binary traces are
+    # not validated on read) fail in every model. A malloc that reuses the
+    # id of a live allocation is counted in duplicate_ids and skipped: the
+    # live block keeps the id until the trace frees it.
+    def __init__(self, memory=None, strategy=None, buddy=None, vm=None, caches=(),
+                 recorder=None, slab=None):
+        if (memory is None) != (strategy is None):
+            raise ValueError("memory and strategy must be given together")
+
+        self.memory = memory
+        self.strategy = strategy
+        self.buddy = buddy
+        self.slab = slab                # allocator.slab.SlabAllocator or None
+        self.vm = vm
+        self.caches = list(caches)      # L1 first
+        self.recorder = recorder        # stats.recorder.MetricsRecorder or None
+        self.probe = None               # stats.instrument.Probe, if models are instrumented
+        self.compactor = None           # allocator.compaction.Compactor behind the strategy
+
+        self.stats = StatsTracker(total_memory=memory.size if memory else 0)
+
+        self.block_ids = {}     # trace id -> PhysicalMemory block id
+        self.buddy_addrs = {}   # trace id -> buddy address
+        self.slab_addrs = {}    # trace id -> slab object address
+
+        self.operations = 0
+        self.accesses = 0
+        self.unknown_frees = 0
+        self.duplicate_ids = 0
+
+    def run(self, chunks):
+        for chunk in chunks:
+            self.feed(*chunk)
+        return self.summary()
+
+    def feed(self, ops, values, ids):
+        # One chunk, sampled by the recorder if there is one
+        if self.recorder is None:
+            self.run_chunk(ops, values, ids)
+        else:
+            self._run_recorded(ops, values, ids)
+
+    def _run_recorded(self, ops, values, ids):
+        # Split the chunk so a sample lands exactly every `every` operations
+        recorder = self.recorder
+        start = 0
+        while start < len(ops):
+            end = min(len(ops), start + recorder.due_in())
+            self.run_chunk(ops[start:end], values[start:end], ids[start:end])
+            if recorder.advance(end - start):
+                recorder.record(self.sample())
+            start = end
+
+    def sample(self):
+        # Point-in-time metrics for MetricsRecorder
+        values = {}
+        if self.memory is not None:
+            values["utilization"] = self.stats.utilization_of(self.memory)
+            values["external_fragmentation"] = self.stats.fragmentation_of(self.memory)
+        if self.buddy is not None:
+            values["buddy_fragmentation"] = self.stats.fragmentation_of(self.buddy)
+        if self.caches:
+            l1 = self.caches[0]
+            total = l1.hits + l1.misses
+            values["hit_rate"] = l1.hits / total if total else 0.0
+        if self.vm is not None:
+            values["page_fault_rate"] = self.vm.fault_rate()
+            if self.vm.tlb is not None:
+                values["tlb_hit_rate"] = self.vm.tlb.hit_rate()
+        return values
+
+    def run_chunk(self, ops, values, ids):
+        memory = self.memory
+        malloc = self.strategy.malloc if self.strategy else None
+        buddy = self.buddy
+        slab = self.slab
+        stats = self.stats
+        block_ids = self.block_ids
+        buddy_addrs = self.buddy_addrs
+        slab_addrs = self.slab_addrs
+
+        addresses = array("q")
+
+        for i in range(len(ops)):
+            op = ops[i]
+
+            if op == OP_MALLOC:
+                size = values[i]
+                trace_id = ids[i]
+                if trace_id != NO_ID and (trace_id in block_ids or trace_id in buddy_addrs
+                                          or trace_id in slab_addrs):
+                    self.duplicate_ids += 1
+                    continue
+
+                if memory is not None:
+                    stats.record_request()
+                    block_id = malloc(memory, size)
+                    if block_id is None:
+                        stats.record_failure()
+                    else:
+                        stats.record_success()
+                        block_ids[trace_id] = block_id
+                if buddy is not None:
+                    addr = buddy.malloc(size)
+                    if addr is not None:
+                        buddy_addrs[trace_id] = addr
+                if slab is not None:
+                    addr = slab.malloc(size)
+                    if addr is not None:
+                        slab_addrs[trace_id] = addr
+
+            elif op == OP_FREE:
+                trace_id = ids[i]
+                known = False
+                if memory is not None:
+                    block_id = block_ids.pop(trace_id, None)
+                    if block_id is not None:
+                        memory.free(block_id)
+                        known = True
+                if buddy is not None:
+                    addr = buddy_addrs.pop(trace_id, None)
+                    if addr is not None:
+                        buddy.free_block(addr)
+                        known = True
+                if slab is not None:
+                    addr = slab_addrs.pop(trace_id, None)
+                    if addr is not None:
+                        slab.free(addr)
+                        known = True
+                if not known and (memory is not None or buddy is not None
+                                  or slab is not None):
+                    self.unknown_frees += 1
+
+            else:
+                # READ / WRITE
+                addresses.append(values[i])
+
+        self.operations += len(ops)
+        self.accesses += len(addresses)
+
+        if self.vm is not None and addresses:
+            addresses = self.vm.access_batch(addresses)["physical"]
+
+        # Walk the cache hierarchy level by level: misses go one level down
+        for cache in self.caches:
+            if not addresses:
+                break
+            hit = cache.access_batch(addresses)["hit"]
+            addresses = array("q", (a for a, h in zip(addresses, hit) if not h))
+
+    def summary(self):
+        result = {
+            "operations": self.operations,
+            "accesses": self.accesses,
+            "unknown_frees": self.unknown_frees,
+            "duplicate_ids": self.duplicate_ids,
+        }
+
+        if self.memory is not None:
+            used = self.memory.used_bytes
+            result["physical"] = {
+                "requests": self.stats.total_requests,
+                "successful": self.stats.successful_allocations,
+                "failed": self.stats.failed_allocations,
+                "used": used,
+                "utilization": self.stats.memory_utilization(used),
+                "external_fragmentation": self.stats.fragmentation_of(self.memory),
+            }
+            if self.compactor is not None:
+                result["physical"]["compaction"] = self.compactor.summary()
+
+        if self.buddy is not None:
+            result["buddy"] = {
+                "allocated_blocks": len(self.buddy.used),
+                "failed": self.buddy.failed_allocations,
+                "used": self.buddy.used_bytes,
+                "external_fragmentation": self.stats.fragmentation_of(self.buddy),
+                "internal_fragmentation": self.buddy.internal_fragmentation,
+            }
+
+        if self.slab is not None:
+            result["slab"] = {
+                "objects": len(self.slab.objects),
+                "large_objects": len(self.slab.large),
+                "failed": self.slab.failed_allocations,
+                "slab_bytes": self.slab.slab_bytes,
+                "utilization": self.stats.slab_utilization_of(self.slab),
+                "internal_waste": self.stats.slab_waste_of(self.slab),
+                "caches": self.slab.cache_info(),
+            }
+
+        if self.vm is not None:
+            vm = {"page_faults": self.vm.page_faults}
+            if self.vm.tlb is not None:
+                vm["tlb_hits"] = self.vm.tlb.hits
+                vm["tlb_misses"] = self.vm.tlb.misses
+            result["vm"] = vm
+
+        result["caches"] = [
+            {"name": c.name, "hits": c.hits, "misses": c.misses}
+            for c in self.caches
+        ]
+        return result
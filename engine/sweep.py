@@ -0,0 +1,90 @@
+import csv
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from src.cache.cache_level import CacheLevel
+from src.engine.binary_trace import BinaryTrace, convert_text_trace, is_binary_trace
+from src.engine.trace_reader import DEFAULT_CHUNK_SIZE
+from src.virtual_memory.vm_manager import VirtualMemoryManager
+
+
+# ---------- Workers (module level so they can be pickled) ----------
+def _run_cache(path, config, chunk_size):
+    cache = CacheLevel(
+        "sweep", config["cache_size"], config["block_size"],
+        config["associativity"], config.get("policy", "LRU")
+    )
+    with BinaryTrace(path) as trace:
+        for addresses in trace.address_chunks(chunk_size):
+            cache.access_batch(addresses)
+
+    accesses = cache.hits + cache.misses
+    return dict(
+        kind="cache", **config,
+        hits=cache.hits, misses=cache.misses,
+        miss_ratio=cache.misses / accesses if accesses else 0.0
+    )
+
+
+def _run_vm(path, config, chunk_size):
+    policy = config.get("policy", "FIFO")
+    vm = VirtualMemoryManager(config["frames"], config.get("page_size", 64), policy)
+
+    with BinaryTrace(path) as trace:
+        if policy.upper() == "OPT":
+            vm.load_trace(a for chunk in trace.address_chunks(chunk_size) for a in chunk)
+
+        accesses = 0
+        for addresses in trace.address_chunks(chunk_size):
+            vm.access_batch(addresses)
+            accesses += len(addresses)
+
+    return dict(
+        kind="vm", **config,
+        page_faults=vm.page_faults,
+        fault_rate=vm.page_faults / accesses if accesses else 0.0
+    )
+
+
+# ---------- Driver ----------
+def sweep(trace_path, cache_configs=(), vm_configs=(), workers=None,
+          chunk_size=DEFAULT_CHUNK_SIZE):
+    # cache_configs: dicts with cache_size, block_size, associativity, policy
+    # vm_configs:    dicts with frames, page_size, policy
+    # Every worker memory-maps the same binary trace, so the OS page cache
+    # shares it between processes. Text traces are converted once first.
+    temp_path = None
+    if not is_binary_trace(trace_path):
+        fd, temp_path = tempfile.mkstemp(suffix=".bin")
+        os.close(fd)
+        convert_text_trace(trace_path, temp_path, chunk_size)
+        trace_path = temp_path
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run_cache, trace_path, dict(c), chunk_size)
+                for c in cache_configs
+            ]
+            futures += [
+                pool.submit(_run_vm, trace_path, dict(c), chunk_size)
+                for c in vm_configs
+            ]
+            return [f.result() for f in futures]
+    finally:
+        if temp_path is not None:
+            os.remove(temp_path)
+
+
+def write_table(rows, out):
+    # rows from sweep() -> CSV with the union of all columns
+    columns = []
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+
+    writer = csv.DictWriter(out, fieldnames=columns)
+    writer.writeheader()
+    writer.writerows(rows)
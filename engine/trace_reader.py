@@ -0,0 +1,77 @@
+from array import array
+
+# Operation codes shared by every trace format
+OP_MALLOC = 0
+OP_FREE = 1
+OP_READ = 2
+OP_WRITE = 3
+
+OP_NAMES = {
+    "malloc": OP_MALLOC, "m": OP_MALLOC,
+    "free": OP_FREE, "f": OP_FREE,
+    "read": OP_READ, "r": OP_READ,
+    "write": OP_WRITE, "w": OP_WRITE,
+}
+
+NO_ID = -1
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def new_chunk():
+    # (op codes, address-or-size, allocation id)
+    return bytearray(), array("q"), array("q")
+
+
+def parse_line(line):
+    # "malloc <size> <id>" | "free <id>" | "read <addr>" | "write <addr>"
+    # -> (op, value, id), or None for blank / comment lines
+    line = line.split("#", 1)[0].strip()
+    if not line:
+        return None
+
+    parts = line.split()
+    op = OP_NAMES.get(parts[0].lower())
+    if op is None:
+        raise ValueError(f"Unknown trace operation: {parts[0]!r}")
+
+    try:
+        if op == OP_MALLOC:
+            record = op, int(parts[1], 0), int(parts[2], 0) if len(parts) > 2 else NO_ID
+        elif op == OP_FREE:
+            return op, 0, int(parts[1], 0)
+        else:
+            return op, int(parts[1], 0), NO_ID
+    except (IndexError, ValueError):
+        raise ValueError(f"Malformed trace line: {line!r}") from None
+
+    if record[1] <= 0:
+        raise ValueError(f"Malloc size must be positive: {line!r}")
+    return record
+
+
+def chunks_from_ops(ops, chunk_size=DEFAULT_CHUNK_SIZE):
+    # ops: iterable of (op, value) or (op, value, id) tuples
+    chunk = new_chunk()
+    codes, values, ids = chunk
+    for record in ops:
+        codes.append(record[0])
+        values.append(record[1])
+        ids.append(record[2] if len(record) > 2 else NO_ID)
+        if len(codes) >= chunk_size:
+            yield chunk
+            chunk = new_chunk()
+            codes, values, ids = chunk
+    if codes:
+        yield chunk
+
+
+def read_text_trace(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    # source: path, open text file, or iterable of lines
+    if isinstance(source, str):
+        with open(source) as f:
+            yield from read_text_trace(f, chunk_size)
+        return
+
+    parsed = (parse_line(line) for line in source)
+    yield from chunks_from_ops((r for r in parsed if r is not None), chunk_size)
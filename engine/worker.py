@@ -0,0 +1,121 @@
+import queue
+import threading
+import time
+
+from src.engine.binary_trace import BinaryTrace, is_binary_trace
+from src.engine.trace_reader import read_text_trace
+
+# Operations run between cancel checks / snapshot opportunities
+DEFAULT_STEP = 4096
+
+
+class SimulationWorker(threading.Thread):
+    # Replays a trace file through a TraceSimulator off the caller's thread.
+    # Snapshots (plain dicts) are posted to `snapshots` at most every
+    # `interval` seconds, so a GUI can poll the queue at its own frame rate
+    # and never touches the models while they are being mutated.
+    #
+    # `capture(simulator)`, if given, runs on the worker thread and its
+    # dict is merged into every snapshot (e.g. a copy of the block list).
+    def __init__(self, simulator, path, step=DEFAULT_STEP, interval=1 / 30,
+                 capture=None):
+        super().__init__(daemon=True)
+        self.simulator = simulator
+        self.path = path
+        self.step = step
+        self.interval = interval
+        self.capture = capture
+
+        self.snapshots = queue.Queue(maxsize=4)
+        self.total = None           # operations in the trace, if known
+        self.started = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def run(self):
+        self.started = time.perf_counter()
+        error = None
+        try:
+            self._replay()
+        except Exception as exc:    # reported in the final snapshot
+            error = f"{type(exc).__name__}: {exc}"
+        # The last snapshot must not be dropped: make room for it rather
+        # than blocking on a consumer that may have stopped polling
+        final = self.snapshot(done=True, error=error)
+        while True:
+            try:
+                self.snapshots.put_nowait(final)
+                return
+            except queue.Full:
+                try:
+                    self.snapshots.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _replay(self):
+        simulator = self.simulator
+        step = self.step
+        next_post = 0.0
+
+        if is_binary_trace(self.path):
+            trace = BinaryTrace(self.path)
+            self.total = len(trace)
+            chunks = trace.chunks(step)
+        else:
+            trace = None
+            chunks = read_text_trace(self.path, step)
+
+        chunk = None
+        failure = None
+        try:
+            for chunk in chunks:
+                if self._cancel.is_set():
+                    break
+                simulator.feed(*chunk)
+
+                now = time.perf_counter()
+                if now >= next_post:
+                    try:
+                        self.snapshots.put_nowait(self.snapshot())
+                    except queue.Full:
+                        pass    # consumer is behind; the next one will do
+                    next_post = now + self.interval
+        except Exception as exc:
+            # Keep the error but not its traceback: the failed call's frames
+            # still hold views of the mapping, which would make close() fail
+            failure = exc.with_traceback(None)
+        finally:
+            # Drop our reference to the views before the mapping goes away
+            chunk = None
+            try:
+                chunks.close()
+                if trace is not None:
+                    trace.close()
+            except BufferError:
+                if failure is None:
+                    raise
+                # otherwise report the chunk's error, not this one
+        if failure is not None:
+            raise failure
+
+    def snapshot(self, done=False, error=None):
+        simulator = self.simulator
+        snapshot = {
+            "operations": simulator.operations,
+            "total": self.total,
+            "elapsed": time.perf_counter() - self.started,
+            "summary": simulator.summary(),
+            "sample": simulator.sample(),
+            "done": done,
+            "cancelled": self._cancel.is_set(),
+            "error": error,
+        }
+        if self.capture is not None:
+            snapshot.update(self.capture(simulator))
+        return snapshot
@@ -1,26 +1,39 @@
+import json
+import queue
+from bisect import bisect_left, insort
 import tkinter as tk
-from tkinter import ttk
+from tkinter import filedialog, ttk
 
 from src.allocator.physical_memory import PhysicalMemory
 from src.allocator.first_fit import FirstFit
 from src.allocator.best_fit import BestFit
 from src.allocator.worst_fit import WorstFit
+from src.allocator.tlsf import TLSF
+from src.allocator.compaction import Compactor
 from src.stats.tracker import StatsTracker
+from src.stats.recorder import MetricsRecorder
 from src.buddy.buddy_allocator import BuddyAllocator
 from src.virtual_memory.vm_manager import VirtualMemoryManager
-from src.stats.metrics import fragmentation
+from src.virtual_memory.tlb import TLB
 from src.cache.cache_level import CacheLevel
+from src.engine.simulator import TraceSimulator
+from src.engine.worker import SimulationWorker
+from src.gui.memory_bar import MemoryBar
+from src.gui.virtual_table import VirtualTable
 
 
 class MemorySimulatorGUI:
     def __init__(self):
         # ================= BACKEND =================
         self.memory = PhysicalMemory(1024)
+        self.compactor = Compactor(self.memory)
+        self.last_compaction = None     # relocation map shown after Compact
 
         self.algorithms = {
             "First Fit": FirstFit(),
             "Best Fit": BestFit(),
             "Worst Fit": WorstFit(),
+            "TLSF": TLSF(),
         }
 
         self.algorithm = self.algorithms["First Fit"]
@@ -36,13 +49,20 @@ class MemorySimulatorGUI:
             "L2": None
         }
         # ---------- VIRTUAL MEMORY ----------
-        self.vm = VirtualMemoryManager(frames=8, page_size=64, policy="FIFO")
+        self.vm = VirtualMemoryManager(
+            frames=8, page_size=64, policy="FIFO",
+            tlb=TLB(entries=4, associativity=2, policy="LRU")
+        )
         self.stats = StatsTracker(total_memory=1024)
+        self.recorder = MetricsRecorder(every=1, capacity=500)
 
         # ================= GUI =================
         self.root = tk.Tk()
         self.root.title("Memory Management Simulator")
         self.root.geometry("900x600")
+
+        # Redraws requested before the next idle point run once
+        self._pending_draws = []
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True)
         self._build_physical_memory_tab()
@@ -50,6 +70,7 @@ class MemorySimulatorGUI:
         self._build_cache_tab()
         self._build_vm_tab()
         self._build_stats_tab()
+        self._build_replay_tab()
 
 
 
@@ -64,12 +85,13 @@ class MemorySimulatorGUI:
         offset = vm_result["offset"]
         frame = vm_result["frame"]
         fault = vm_result["fault"]
+        tlb_hit = vm_result["tlb_hit"]
 
         physical_address = frame * self.vm.page_size + offset
 
-        if self.l1_cache.access(physical_address):
+        if self.l1_cache.access(physical_address)["hit"]:
             cache_result = "L1 HIT"
-        elif self.l2_cache.access(physical_address):
+        elif self.l2_cache.access(physical_address)["hit"]:
             cache_result = "L2 HIT"
         else:
             cache_result = "MISS → Main Memory"
@@ -80,7 +102,9 @@ class MemorySimulatorGUI:
             "offset": offset,
             "frame": frame,
             "pa": physical_address,
+            "tlb_hit": tlb_hit,
             "page_fault": fault,
+            "evicted": vm_result["evicted"],
             "cache_result": cache_result
         }
     # ==========================================================
@@ -117,9 +141,18 @@ class MemorySimulatorGUI:
 
         ttk.Button(top, text="Free", command=self._free).pack(side=tk.LEFT, padx=5)
 
+        ttk.Button(top, text="Compact", command=self._compact).pack(side=tk.LEFT, padx=5)
+
         # -------- Memory Bar --------
         self.mem_canvas = tk.Canvas(tab, height=80, bg="white")
         self.mem_canvas.pack(fill=tk.X, padx=10, pady=10)
+        self.mem_canvas.bind(
+            "<Configure>", lambda _: self._schedule_draw(self._draw_memory_bar)
+        )
+        self.mem_bar = MemoryBar(
+            self.mem_canvas,
+            lambda size, free, block_id: f"{size}" if free else f"{size} (id {block_id})"
+        )
 
         # -------- Text Dump --------
         self.mem_output = tk.Text(tab, height=12)
@@ -139,69 +172,76 @@ class MemorySimulatorGUI:
 
         if block_id is not None:
             self.stats.record_success()
-            self.memory.coalesce()
         else:
             self.stats.record_failure()
 
+        self.last_compaction = None
+        self._record_sample()
         self._refresh_memory_view()
 
     def _free(self):
         if self.free_entry.get().isdigit():
-            bid = int(self.free_entry.get())
-            for b in self.memory.blocks:
-                if b.block_id == bid:
-                    b.free = True
-                    b.block_id = None
-                    self.memory.coalesce()
-                    break
+            self.memory.free(int(self.free_entry.get()))
+            self.last_compaction = None
+            self._record_sample()
             self._refresh_memory_view()
 
+    def _compact(self):
+        self.last_compaction = self.compactor.compact()
+        self._record_sample()
+        self._refresh_memory_view()
+
     def _refresh_memory_view(self):
         # -------- Text output --------
         self.mem_output.delete("1.0", tk.END)
         self.mem_output.insert(tk.END, self.memory.dump() + "\n")
 
-        frag = fragmentation(self.memory.blocks)
+        frag = self.stats.fragmentation_of(self.memory)
         self.mem_output.insert(
             tk.END, f"\nExternal Fragmentation: {frag:.2%}\n"
         )
 
+        if self.last_compaction is not None:
+            moves = ", ".join(f"{old}->{new}" for old, new in self.last_compaction.items())
+            self.mem_output.insert(
+                tk.END,
+                f"Compaction: {len(self.last_compaction)} blocks moved "
+                f"({self.compactor.bytes_moved} bytes total): {moves or 'nothing to do'}\n"
+            )
+
         # -------- Visual bar --------
-        self._draw_memory_bar()
+        self._schedule_draw(self._draw_memory_bar)
         self._refresh_stats_view()
 
     def _physical_used_memory(self):
-        return sum(b.size for b in self.memory.blocks if not b.free)
+        return self.memory.used_bytes
 
-    def _draw_memory_bar(self):
-        self.mem_canvas.delete("all")
+    def _schedule_draw(self, draw):
+        if not self._pending_draws:
+            self.root.after_idle(self._run_pending_draws)
+        if draw not in self._pending_draws:
+            self._pending_draws.append(draw)
+
+    def _run_pending_draws(self):
+        draws, self._pending_draws = self._pending_draws, []
+        for draw in draws:
+            draw()
 
-        total_mem = self.memory.size
+    def _draw_memory_bar(self):
         canvas_width = self.mem_canvas.winfo_width()
 
-        # Handle initial draw before window is ready
+        # Not on screen yet: <Configure> redraws once the canvas has a size
         if canvas_width <= 1:
-            self.root.after(100, self._draw_memory_bar)
             return
 
-        x = 0
-        for block in self.memory.blocks:
-            block_width = (block.size / total_mem) * canvas_width
+        self.mem_bar.draw(self._memory_segments(self.memory), self.memory.size, canvas_width)
 
-            color = "#6ab04c" if block.free else "#eb4d4b"  # green / red
-            self.mem_canvas.create_rectangle(
-                x, 10, x + block_width, 70, fill=color, outline="black"
-            )
-
-            label = f"{block.size}"
-            if not block.free:
-                label += f" (id {block.block_id})"
-
-            self.mem_canvas.create_text(
-                x + block_width / 2, 40, text=label, font=("Arial", 9)
-            )
-
-            x += block_width
+    @staticmethod
+    def _memory_segments(memory):
+        block = memory.head
+        while block is not None:
+            yield block.start, block.size, block.free, block.block_id
+            block = block.next
 
     # ==========================================================
     # BUDDY TAB
@@ -229,6 +269,10 @@ class MemorySimulatorGUI:
         # -------- Buddy Memory Bar --------
         self.buddy_canvas = tk.Canvas(tab, height=80, bg="white")
         self.buddy_canvas.pack(fill=tk.X, padx=10, pady=10)
+        self.buddy_canvas.bind(
+            "<Configure>", lambda _: self._schedule_draw(self._draw_buddy_bar)
+        )
+        self.buddy_bar = MemoryBar(self.buddy_canvas, lambda size, free, _: f"{size}")
 
         # -------- Text View --------
         self.buddy_output = tk.Text(tab, height=12)
@@ -254,11 +298,13 @@ class MemorySimulatorGUI:
         else:
             self.stats.record_failure()
 
+        self._record_sample()
         self._refresh_buddy_view()
 
     def _buddy_free(self):
         if self.buddy_free_entry.get().isdigit():
             self.buddy.free_block(int(self.buddy_free_entry.get()))
+            self._record_sample()
             self._refresh_buddy_view()
 
     def _refresh_buddy_view(self):
@@ -277,51 +323,33 @@ class MemorySimulatorGUI:
         self.buddy_output.insert(tk.END, "\nFree Lists:\n")
         for o in range(self.buddy.max_order + 1):
             self.buddy_output.insert(
-                tk.END, f"Order {o} (size {1 << o}): {self.buddy.free[o]}\n"
+                tk.END, f"Order {o} (size {1 << o}): {list(self.buddy.free[o])}\n"
             )
 
         # -------- Visual --------
-        self._draw_buddy_bar()
+        self._schedule_draw(self._draw_buddy_bar)
         self._refresh_stats_view()
 
     def _draw_buddy_bar(self):
-        self.buddy_canvas.delete("all")
-
-        total_mem = self.buddy.size
         canvas_width = self.buddy_canvas.winfo_width()
 
         if canvas_width <= 1:
-            self.root.after(100, self._draw_buddy_bar)
             return
 
-        segments = []
-
-        # Allocated blocks
-        for addr, order in self.buddy.used.items():
-            segments.append((addr, 1 << order, False))
-
-        # Free blocks
-        for order, addrs in self.buddy.free.items():
-            for addr in addrs:
-                segments.append((addr, 1 << order, True))
-
-        segments.sort(key=lambda x: x[0])
-
-        x = 0
-        for addr, size, is_free in segments:
-            width = (size / total_mem) * canvas_width
-            color = "#6ab04c" if is_free else "#eb4d4b"
-
-            self.buddy_canvas.create_rectangle(
-                x, 10, x + width, 70, fill=color, outline="black"
-            )
-
-            label = f"{size}"
-            self.buddy_canvas.create_text(
-                x + width / 2, 40, text=label, font=("Arial", 9)
-            )
-
-            x += width
+        self.buddy_bar.draw(self._buddy_segments(), self.buddy.size, canvas_width)
+
+    def _buddy_segments(self):
+        # Buddy blocks tile the heap: walk it by address instead of sorting
+        buddy = self.buddy
+        addr = 0
+        while addr < buddy.size:
+            order = buddy.used.get(addr)
+            if order is not None:
+                yield addr, 1 << order, False, None
+            else:
+                order = next(o for o in range(buddy.max_order + 1) if addr in buddy.free[o])
+                yield addr, 1 << order, True, None
+            addr += 1 << order
 
     # ==========================================================
     # CACHE TAB (STANDALONE)
@@ -339,8 +367,19 @@ class MemorySimulatorGUI:
 
         ttk.Button(top, text="Access", command=self._cache_access_ui).pack(side=tk.LEFT)
 
-        self.cache_output = tk.Text(tab)
-        self.cache_output.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # One virtualized table of sets per level
+        self.cache_tables = {}
+        self.cache_labels = {}
+        for cache in (self.l1_cache, self.l2_cache):
+            label = ttk.Label(tab)
+            label.pack(anchor=tk.W, padx=10)
+            table = VirtualTable(
+                tab, lambda i, cache=cache: self._format_cache_set(cache, i),
+                count=cache.num_sets, height=8
+            )
+            table.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+            self.cache_labels[cache.name] = label
+            self.cache_tables[cache.name] = table
 
         self._refresh_cache_view()
 
@@ -349,6 +388,8 @@ class MemorySimulatorGUI:
             return
 
         addr = int(self.cache_entry.get())
+        previous = dict(self.last_cache_access)
+
         result = self.l1_cache.access(addr)
         self.last_cache_access["L1"] = result
 
@@ -358,41 +399,51 @@ class MemorySimulatorGUI:
         else:
             self.last_cache_access["L2"] = None
 
-        self._refresh_cache_view()
-
-    def _refresh_cache_view(self):
-        self.cache_output.delete("1.0", tk.END)
+        self._record_sample()
+        self._refresh_cache_view(previous)
+        self._refresh_stats_view()
 
+    def _refresh_cache_view(self, previous=None):
+        # Only the set touched now and the one highlighted before change
         for cache in (self.l1_cache, self.l2_cache):
-            self.cache_output.insert(
-                tk.END,
-                f"{cache.name} Cache (Hits={cache.hits}, Misses={cache.misses})\n"
+            self.cache_labels[cache.name].config(
+                text=f"{cache.name} Cache (Hits={cache.hits}, Misses={cache.misses})"
             )
 
-            last = self.last_cache_access.get(cache.name)
+            table = self.cache_tables[cache.name]
+            if previous is None:
+                table.render()
+                continue
 
-            for i, cache_set in enumerate(cache.sets):
-                line = f"  Set {i}: "
+            last = self.last_cache_access.get(cache.name)
+            before = previous.get(cache.name)
+            if last:
+                table.see(last["set"])
+            table.refresh({
+                access["set"] for access in (last, before) if access
+            })
 
-                for idx, cl in enumerate(cache_set):
-                    if cl.valid:
-                        box = f"[{cl.tag}]"
-                    else:
-                        box = "[ - ]"
+    def _format_cache_set(self, cache, i):
+        last = self.last_cache_access.get(cache.name)
+        line = f"  Set {i}: "
 
-                    # Highlight accessed set
-                    if last and last["set"] == i:
-                        box = f"*{box}*"
+        for cl in cache.sets[i]:
+            if cl.valid:
+                box = f"[{cl.tag}]"
+            else:
+                box = "[ - ]"
 
-                    # Highlight eviction
-                    if last and last["set"] == i and last["evicted"]:
-                        box = f"!{box}!"
+            # Highlight accessed set
+            if last and last["set"] == i:
+                box = f"*{box}*"
 
-                    line += box + " "
+            # Highlight eviction
+            if last and last["set"] == i and last["evicted"]:
+                box = f"!{box}!"
 
-                self.cache_output.insert(tk.END, line + "\n")
+            line += box + " "
 
-            self.cache_output.insert(tk.END, "\n")
+        return line
 
     # ==========================================================
     # VIRTUAL MEMORY TAB (INTEGRATED)
@@ -410,9 +461,37 @@ class MemorySimulatorGUI:
 
         ttk.Button(top, text="Access", command=self._vm_access_ui).pack(side=tk.LEFT)
 
-        self.vm_output = tk.Text(tab)
-        self.vm_output.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
+        ttk.Label(top, text="Replacement:").pack(side=tk.LEFT, padx=10)
+        self.vm_policy_var = tk.StringVar(value=self.vm.policy)
+        ttk.OptionMenu(
+            top,
+            self.vm_policy_var,
+            self.vm.policy,
+            "FIFO", "LRU", "CLOCK",
+            command=self._set_vm_policy
+        ).pack(side=tk.LEFT)
+
+        self.vm_output = tk.Text(tab, height=12)
+        self.vm_output.pack(fill=tk.X, padx=10, pady=10)
+
+        # -------- Page table / frames (virtualized) --------
+        tables = ttk.Frame(tab)
+        tables.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        left = ttk.Frame(tables)
+        left.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.page_table_label = ttk.Label(left)
+        self.page_table_label.pack(anchor=tk.W)
+        self.page_table_view = VirtualTable(left, self._format_page_row)
+        self.page_table_view.pack(fill=tk.BOTH, expand=True)
+
+        right = ttk.Frame(tables)
+        right.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10, 0))
+        ttk.Label(right, text="Physical Frames:").pack(anchor=tk.W)
+        self.frames_view = VirtualTable(right, self._format_frame_row)
+        self.frames_view.pack(fill=tk.BOTH, expand=True)
+
+        self._reset_vm_tables()
         self._refresh_vm_view()
 
     def _vm_access_ui(self):
@@ -420,7 +499,33 @@ class MemorySimulatorGUI:
             return
 
         result = self._integrated_access(int(self.vm_addr_entry.get()))
+        self._record_sample()
         self._refresh_vm_view(result)
+        self._refresh_stats_view()
+
+    def _set_vm_policy(self, policy):
+        # Start over with empty frames under the new policy
+        tlb = self.vm.tlb
+        self.vm = VirtualMemoryManager(
+            frames=self.vm.num_frames, page_size=self.vm.page_size, policy=policy,
+            tlb=TLB(tlb.entries, tlb.associativity, tlb.policy.name)
+        )
+        self._reset_vm_tables()
+        self._refresh_vm_view()
+
+    def _reset_vm_tables(self):
+        # Resident pages in page order, kept sorted as pages come and go
+        self.resident_pages = sorted(page for page, _ in self.vm.page_table.items())
+        self.page_table_view.set_count(len(self.resident_pages))
+        self.frames_view.set_count(self.vm.num_frames)
+
+    def _format_page_row(self, i):
+        page = self.resident_pages[i]
+        return f"  Page {page}: VALID, Frame {self.vm.page_table.lookup(page)}"
+
+    def _format_frame_row(self, i):
+        p = self.vm.frames[i]
+        return f"  Frame {i}: {'Page ' + str(p) if p is not None else 'FREE'}"
 
     def _refresh_vm_view(self, last=None):
         self.vm_output.delete("1.0", tk.END)
@@ -432,6 +537,7 @@ class MemorySimulatorGUI:
                 f"  Virtual Address : {last['va']}\n"
                 f"  Page Number     : {last['page']}\n"
                 f"  Offset          : {last['offset']}\n"
+                f"  TLB             : {'HIT' if last['tlb_hit'] else 'MISS'}\n"
                 f"  Frame Number    : {last['frame']}\n"
                 f"  Physical Address: {last['pa']}\n"
                 f"  Page Fault      : {'YES' if last['page_fault'] else 'NO'}\n"
@@ -439,21 +545,33 @@ class MemorySimulatorGUI:
             )
 
         self.vm_output.insert(
-            tk.END, f"Total Page Faults: {self.vm.page_faults}\n\n"
+            tk.END,
+            f"Total Page Faults: {self.vm.page_faults}\n"
+            f"TLB Hits/Misses  : {self.vm.tlb.hits}/{self.vm.tlb.misses}\n\n"
         )
 
-        self.vm_output.insert(tk.END, "Page Table:\n")
-        for p, e in sorted(self.vm.page_table.items()):
-            self.vm_output.insert(
-                tk.END,
-                f"  Page {p}: {'VALID' if e.valid else 'INVALID'}, Frame {e.frame}\n"
-            )
+        overhead = self.vm.page_table.overhead()
+        self.page_table_label.config(
+            text=f"Page Table ({overhead['levels']} levels, "
+                 f"{overhead['interior_nodes'] + overhead['leaf_nodes']} nodes, "
+                 f"{overhead['bytes']} bytes):"
+        )
 
-        self.vm_output.insert(tk.END, "\nPhysical Frames:\n")
-        for i, p in enumerate(self.vm.frames):
-            self.vm_output.insert(
-                tk.END, f"  Frame {i}: {'Page ' + str(p) if p is not None else 'FREE'}\n"
-            )
+        if last and last["page_fault"]:
+            # A page came in (and maybe one went out): rows shift
+            pages = self.resident_pages
+            if last["evicted"] is not None:
+                del pages[bisect_left(pages, last["evicted"])]
+            insort(pages, last["page"])
+            self.page_table_view.set_count(len(pages))
+            self.frames_view.refresh([last["frame"]])
+        elif last is None:
+            self.page_table_view.render()
+            self.frames_view.render()
+
+        if last:
+            self.page_table_view.see(bisect_left(self.resident_pages, last["page"]))
+            self.frames_view.see(last["frame"])
 
     # ==========================================================
     # STATS TAB
@@ -462,11 +580,66 @@ class MemorySimulatorGUI:
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Stats / Graphs")
 
-        self.stats_output = tk.Text(tab)
+        self.stats_output = tk.Text(tab, height=16)
         self.stats_output.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
+        # -------- Metric graphs (from self.recorder) --------
+        self.graph_canvas = tk.Canvas(tab, height=200, bg="white")
+        self.graph_canvas.pack(fill=tk.X, padx=10, pady=5)
+        self.graph_canvas.bind(
+            "<Configure>", lambda _: self._schedule_draw(self._draw_graphs)
+        )
+
         self._refresh_stats_view()
 
+    GRAPH_COLORS = {
+        "utilization": "#eb4d4b",
+        "external_fragmentation": "#f0932b",
+        "hit_rate": "#6ab04c",
+        "page_fault_rate": "#4834d4",
+    }
+
+    def _record_sample(self):
+        l1 = self.l1_cache
+        accesses = l1.hits + l1.misses
+
+        if self.recorder.advance():
+            self.recorder.record({
+                "utilization": self.stats.utilization_of(self.memory),
+                "external_fragmentation": self.stats.fragmentation_of(self.memory),
+                "hit_rate": l1.hits / accesses if accesses else 0.0,
+                "page_fault_rate": self.vm.fault_rate(),
+            })
+
+    def _draw_graphs(self):
+        canvas = self.graph_canvas
+        canvas.delete("all")
+
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        if width <= 1:
+            return
+
+        # Legend
+        x = 10
+        for name, color in self.GRAPH_COLORS.items():
+            canvas.create_text(x, 10, text=name, fill=color, anchor="w", font=("Arial", 9))
+            x += 8 * len(name) + 20
+
+        samples = len(self.recorder)
+        if samples < 2:
+            return
+
+        # All metrics are ratios: plot 0..1 over the kept samples
+        top, bottom = 25, height - 10
+        step = (width - 20) / (samples - 1)
+        for name, color in self.GRAPH_COLORS.items():
+            points = []
+            for i, value in enumerate(self.recorder.series(name)):
+                points.append(10 + i * step)
+                points.append(bottom - value * (bottom - top))
+            canvas.create_line(*points, fill=color, width=2)
+
     def _refresh_stats_view(self):
         # Guard: stats tab not built yet
         if not hasattr(self, "stats_output"):
@@ -476,7 +649,7 @@ class MemorySimulatorGUI:
 
         used_mem = self._physical_used_memory()
         utilization = self.stats.memory_utilization(used_mem)
-        ext_frag = fragmentation(self.memory.blocks)
+        ext_frag = self.stats.fragmentation_of(self.memory)
 
         self.stats_output.insert(
             tk.END,
@@ -500,8 +673,160 @@ class MemorySimulatorGUI:
         self.stats_output.insert(
             tk.END,
             "=== Buddy Allocator Statistics ===\n"
+            f"Used Memory                   : {self.buddy.used_bytes}\n"
+            f"Largest Free Block            : {self.buddy.largest_free()}\n"
+            f"External Fragmentation        : {self.stats.fragmentation_of(self.buddy) * 100:.2f}%\n"
             f"Internal Fragmentation (bytes): {self.stats.internal_fragmentation}\n"
         )
 
+        self._schedule_draw(self._draw_graphs)
+
+    # ==========================================================
+    # TRACE REPLAY TAB (BACKGROUND WORKER)
+    # ==========================================================
+    REPLAY_FRAME_MS = 33    # ~30 fps
+
+    def _build_replay_tab(self):
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text="Trace Replay")
+
+        # -------- Controls --------
+        top = ttk.Frame(tab)
+        top.pack(fill=tk.X, padx=10, pady=5)
+
+        ttk.Label(top, text="Trace file:").pack(side=tk.LEFT)
+        self.replay_path_entry = ttk.Entry(top, width=40)
+        self.replay_path_entry.pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(top, text="Browse...", command=self._browse_trace).pack(side=tk.LEFT)
+
+        ttk.Label(top, text="Memory size:").pack(side=tk.LEFT, padx=5)
+        self.replay_size_entry = ttk.Entry(top, width=10)
+        self.replay_size_entry.insert(0, "65536")
+        self.replay_size_entry.pack(side=tk.LEFT)
+
+        self.replay_run_button = ttk.Button(top, text="Run", command=self._start_replay)
+        self.replay_run_button.pack(side=tk.LEFT, padx=5)
+
+        self.replay_cancel_button = ttk.Button(
+            top, text="Cancel", command=self._cancel_replay, state=tk.DISABLED
+        )
+        self.replay_cancel_button.pack(side=tk.LEFT)
+
+        # -------- Progress --------
+        self.replay_progress = ttk.Progressbar(tab, mode="determinate", maximum=1.0)
+        self.replay_progress.pack(fill=tk.X, padx=10, pady=5)
+
+        self.replay_status = ttk.Label(tab, text="Idle")
+        self.replay_status.pack(anchor=tk.W, padx=10)
+
+        # -------- Live view --------
+        self.replay_canvas = tk.Canvas(tab, height=80, bg="white")
+        self.replay_canvas.pack(fill=tk.X, padx=10, pady=10)
+        self.replay_bar = MemoryBar(
+            self.replay_canvas, lambda size, free, block_id: f"{size}"
+        )
+
+        self.replay_output = tk.Text(tab, height=12)
+        self.replay_output.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        self.replay_worker = None
+
+    def _browse_trace(self):
+        path = filedialog.askopenfilename(title="Open trace")
+        if path:
+            self.replay_path_entry.delete(0, tk.END)
+            self.replay_path_entry.insert(0, path)
+
+    def _start_replay(self):
+        path = self.replay_path_entry.get().strip()
+        size = self.replay_size_entry.get().strip()
+        if self.replay_worker is not None or not path or not size.isdigit():
+            return
+
+        # Fresh models with the interactive settings: the worker thread owns
+        # them, the GUI only ever sees its snapshots
+        tlb = self.vm.tlb
+        simulator = TraceSimulator(
+            PhysicalMemory(int(size)), type(self.algorithm)(),
+            vm=VirtualMemoryManager(
+                self.vm.num_frames, self.vm.page_size, self.vm.policy,
+                tlb=TLB(tlb.entries, tlb.associativity, tlb.policy.name)
+            ),
+            caches=[
+                CacheLevel(c.name, c.cache_size, c.block_size, c.associativity, c.policy.name)
+                for c in (self.l1_cache, self.l2_cache)
+            ]
+        )
+
+        self.replay_worker = SimulationWorker(
+            simulator, path,
+            capture=lambda sim: {"segments": list(self._memory_segments(sim.memory))}
+        )
+        self.replay_size = int(size)
+        self.replay_progress.config(mode="determinate", value=0)
+        self.replay_run_button.config(state=tk.DISABLED)
+        self.replay_cancel_button.config(state=tk.NORMAL)
+        self.replay_status.config(text="Starting...")
+
+        self.replay_worker.start()
+        self.root.after(self.REPLAY_FRAME_MS, self._poll_replay)
+
+    def _cancel_replay(self):
+        if self.replay_worker is not None:
+            self.replay_worker.cancel()
+
+    def _poll_replay(self):
+        # Only the newest snapshot is worth drawing
+        snapshot = None
+        while True:
+            try:
+                snapshot = self.replay_worker.snapshots.get_nowait()
+            except queue.Empty:
+                break
+
+        if snapshot is not None:
+            self._show_replay(snapshot)
+            if snapshot["done"]:
+                self.replay_worker = None
+                self.replay_run_button.config(state=tk.NORMAL)
+                self.replay_cancel_button.config(state=tk.DISABLED)
+                return
+
+        self.root.after(self.REPLAY_FRAME_MS, self._poll_replay)
+
+    def _show_replay(self, snapshot):
+        operations = snapshot["operations"]
+        elapsed = snapshot["elapsed"]
+        rate = operations / elapsed if elapsed else 0.0
+
+        if snapshot["total"]:
+            self.replay_progress.config(value=operations / snapshot["total"])
+        elif snapshot["done"]:
+            self.replay_progress.config(mode="determinate", value=1.0)
+        else:
+            # Text traces: length unknown until the end
+            self.replay_progress.config(mode="indeterminate")
+            self.replay_progress.step(0.05)
+
+        if snapshot["error"]:
+            state = f"Failed: {snapshot['error']}"
+        elif snapshot["cancelled"]:
+            state = "Cancelled"
+        elif snapshot["done"]:
+            state = "Done"
+        else:
+            state = "Running"
+        self.replay_status.config(
+            text=f"{state} - {operations:,} operations, {elapsed:.1f}s ({rate:,.0f} ops/s)"
+        )
+
+        width = self.replay_canvas.winfo_width()
+        if width > 1:
+            self.replay_bar.draw(snapshot["segments"], self.replay_size, width)
+
+        self.replay_output.delete("1.0", tk.END)
+        self.replay_output.insert(tk.END, json.dumps(snapshot["summary"], indent=2))
+
     def run(self):
         self.root.mainloop()
\ No newline at end of file
@@ -0,0 +1,116 @@
+
+FREE_COLOR = "#6ab04c"   # green
+USED_COLOR = "#eb4d4b"   # red
+
+# Mixed-run shades from mostly free to mostly used
+MIXED_COLORS = ("#8fbf5a", "#b5a94f", "#d48a48", "#e46a47")
+
+MIN_BLOCK_PX = 3         # narrower blocks are folded into summary runs
+CHAR_PX = 7              # rough label width per character
+
+
+def _mixed_color(used_fraction):
+    return MIXED_COLORS[min(int(used_fraction * len(MIXED_COLORS)), len(MIXED_COLORS) - 1)]
+
+
+class MemoryBar:
+    # Draws (start, size, free, tag) segments on a canvas; labeler(size,
+    # free, tag) is only called for blocks wide enough to show a label.
+    # Blocks too narrow to see are merged into ~1px summary runs shaded by
+    # how much of them is used, so the item count is bounded by the canvas
+    # width, and only runs whose position, colour or label changed are
+    # touched.
+    def __init__(self, canvas, labeler, top=10, bottom=70):
+        self.canvas = canvas
+        self.labeler = labeler
+        self.top = top
+        self.bottom = bottom
+        self.items = {}     # (x0, x1) -> (rect id, text id or None, color, label)
+
+    def _runs(self, segments, total, width):
+        scale = width / total if total else 0
+        runs = []
+
+        # Pending summary run: [x0, x1, used bytes, bytes]
+        pending = None
+
+        def flush():
+            x0, x1, used, size = pending
+            runs.append((x0, x1, _mixed_color(used / size) if 0 < used < size
+                         else (USED_COLOR if used else FREE_COLOR), None))
+
+        for start, size, free, tag in segments:
+            x0 = start * scale
+            x1 = (start + size) * scale
+
+            if x1 - x0 >= MIN_BLOCK_PX:
+                if pending is not None:
+                    flush()
+                    pending = None
+                label = self.labeler(size, free, tag)
+                if (x1 - x0) < CHAR_PX * len(label):
+                    label = None
+                runs.append((x0, x1, FREE_COLOR if free else USED_COLOR, label))
+                continue
+
+            if pending is None:
+                pending = [x0, x1, 0, 0]
+            pending[1] = x1
+            pending[3] += size
+            if not free:
+                pending[2] += size
+            if pending[1] - pending[0] >= 1:
+                flush()
+                pending = None
+
+        if pending is not None and pending[3]:
+            flush()
+        return runs
+
+    def draw(self, segments, total, width):
+        canvas = self.canvas
+        mid = (self.top + self.bottom) / 2
+        seen = {}
+
+        for x0, x1, color, label in self._runs(segments, total, width):
+            key = (round(x0), max(round(x1), round(x0) + 1))
+            if key in seen:
+                continue   # rounds onto a pixel already drawn this pass
+
+            old = self.items.pop(key, None)
+            if old is None:
+                rect = canvas.create_rectangle(
+                    key[0], self.top, key[1], self.bottom, fill=color,
+                    outline="black" if label is not None else color
+                )
+                text = None
+            else:
+                rect, text, old_color, old_label = old
+                if old_color != color or (old_label is None) != (label is None):
+                    canvas.itemconfigure(
+                        rect, fill=color,
+                        outline="black" if label is not None else color
+                    )
+                if old_label == label:
+                    seen[key] = (rect, text, color, label)
+                    continue
+
+            if text is not None and label is None:
+                canvas.delete(text)
+                text = None
+            elif label is not None:
+                if text is None:
+                    text = canvas.create_text(
+                        (key[0] + key[1]) / 2, mid, text=label, font=("Arial", 9)
+                    )
+                else:
+                    canvas.itemconfigure(text, text=label)
+
+            seen[key] = (rect, text, color, label)
+
+        # Whatever was not reused is gone
+        for rect, text, _, _ in self.items.values():
+            canvas.delete(rect)
+            if text is not None:
+                canvas.delete(text)
+        self.items = seen
@@ -0,0 +1,90 @@
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import ttk
+
+
+class VirtualTable:
+    # Scrollable list of `count` text rows of which only the rows on screen
+    # are ever formatted: format_row(i) -> str is called lazily. Callers
+    # report changed rows with refresh() instead of rebuilding the view, so
+    # the cost of an update does not depend on the size of the structure.
+    def __init__(self, parent, format_row, count=0, height=10):
+        self.format_row = format_row
+        self.count = count
+        self.top = 0            # first row on screen
+        self.rows = height      # rows on screen, follows the widget size
+
+        self.frame = ttk.Frame(parent)
+        self.text = tk.Text(self.frame, height=height, wrap=tk.NONE, font="TkFixedFont")
+        self.scrollbar = ttk.Scrollbar(
+            self.frame, orient=tk.VERTICAL, command=self._on_scroll
+        )
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.linespace = tkfont.nametofont("TkFixedFont").metrics("linespace")
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.text.bind("<Button-4>", lambda e: self.scroll(-1))
+        self.text.bind("<Button-5>", lambda e: self.scroll(1))
+
+        self.render()
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    # ---------- Updates ----------
+    def set_count(self, count):
+        # Rows were added or removed: redraw what is on screen
+        self.count = count
+        self._scroll_to(self.top)
+
+    def refresh(self, rows):
+        # Reformat only the given rows, if they are on screen
+        text = self.text
+        end = min(self.count, self.top + self.rows)
+        for row in rows:
+            if row is None or not self.top <= row < end:
+                continue
+            line = row - self.top + 1
+            text.delete(f"{line}.0", f"{line}.end")
+            text.insert(f"{line}.0", self.format_row(row))
+
+    def see(self, row):
+        if row < self.top:
+            self._scroll_to(row)
+        elif row >= self.top + self.rows:
+            self._scroll_to(row - self.rows + 1)
+
+    def render(self):
+        end = min(self.count, self.top + self.rows)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(self.format_row(i) for i in range(self.top, end)))
+
+        if self.count:
+            self.scrollbar.set(self.top / self.count, end / self.count)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # ---------- Scrolling ----------
+    def scroll(self, rows):
+        self._scroll_to(self.top + rows)
+
+    def _scroll_to(self, top):
+        self.top = max(0, min(top, self.count - self.rows))
+        self.render()
+
+    def _on_scroll(self, action, amount, unit=None):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, units|pages)
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * self.count))
+        elif unit == "pages":
+            self.scroll(int(amount) * self.rows)
+        else:
+            self.scroll(int(amount))
+
+    def _on_resize(self, event):
+        rows = max(1, event.height // self.linespace)
+        if rows != self.rows:
+            self.rows = rows
+            self._scroll_to(self.top)
@@ -1,4 +1,10 @@
-from src.gui.main_window import MemorySimulatorGUI
+import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Headless commands (run / convert), no tkinter needed
+        from src.engine.cli import main
+        sys.exit(main(sys.argv[1:]))
+
+    from src.gui.main_window import MemorySimulatorGUI
     MemorySimulatorGUI().run()
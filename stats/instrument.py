@@ -0,0 +1,116 @@
+import time
+from array import array
+
+_now = time.perf_counter_ns
+
+
+class LogHistogram:
+    # Power-of-two buckets: bucket b holds values with bit_length() == b,
+    # i.e. [2^(b-1), 2^b - 1]; bucket 0 holds zero
+    def __init__(self):
+        self.buckets = array("q", [0]) * 65
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        self.buckets[min(value.bit_length(), 64)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        # Upper bound of the bucket holding the p-th percentile (0 < p <= 100)
+        if self.count == 0:
+            return 0
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min((1 << b) - 1, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max
+        }
+
+
+class Probe:
+    # Collects histograms and counters from instrumented models. Models
+    # keep `probe = None` by default and only touch it behind an
+    # `is not None` check.
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+
+    def record(self, name, value):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LogHistogram()
+        hist.record(value)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        return {
+            "histograms": {k: h.summary() for k, h in sorted(self.histograms.items())},
+            "counters": dict(sorted(self.counters.items()))
+        }
+
+
+# ---------- Latency wrappers ----------
+def _timed(probe, name, fn):
+    def wrapper(*args):
+        start = _now()
+        result = fn(*args)
+        probe.record(name, _now() - start)
+        return result
+    return wrapper
+
+
+class InstrumentedStrategy:
+    # Wraps FirstFit / BestFit / WorstFit / TLSF with malloc latency
+    def __init__(self, strategy, probe):
+        self.strategy = strategy
+        self.probe = probe
+
+    def malloc(self, memory, size):
+        start = _now()
+        result = self.strategy.malloc(memory, size)
+        self.probe.record("malloc_ns", _now() - start)
+        if result is None:
+            self.probe.count("malloc_failures")
+        return result
+
+
+def instrument(model, probe):
+    # Attach `probe` to a model and shadow the methods listed in its
+    # `timed_methods` with timed versions on the instance only;
+    # uninstrument() restores both
+    model.probe = probe
+    index = getattr(model, "free_index", None)
+    if index is not None:
+        index.probe = probe
+
+    for method, name in getattr(model, "timed_methods", {}).items():
+        setattr(model, method, _timed(probe, name, getattr(type(model), method).__get__(model)))
+    return model
+
+
+def uninstrument(model):
+    model.probe = None
+    index = getattr(model, "free_index", None)
+    if index is not None:
+        index.probe = None
+
+    for method in getattr(model, "timed_methods", {}):
+        model.__dict__.pop(method, None)
+    return model
@@ -1,6 +1,11 @@
 
+
+def external_fragmentation(free_bytes, largest_free):
+    if free_bytes == 0: return 0
+    return 1 - largest_free/free_bytes
+
+
 def fragmentation(blocks):
     free = sum(b.size for b in blocks if b.free)
     largest = max((b.size for b in blocks if b.free), default=0)
-    if free == 0: return 0
-    return 1 - largest/free
+    return external_fragmentation(free, largest)
@@ -0,0 +1,87 @@
+import csv
+import math
+from array import array
+
+DEFAULT_METRICS = (
+    "utilization",
+    "external_fragmentation",
+    "hit_rate",
+    "page_fault_rate",
+)
+
+
+class MetricsRecorder:
+    # Samples named metrics every `every` operations into fixed-size ring
+    # buffers, so a run of any length keeps only the last `capacity`
+    # samples. Callers hold `None` instead of a recorder when disabled.
+    def __init__(self, metrics=DEFAULT_METRICS, every=1000, capacity=4096):
+        if every <= 0 or capacity <= 0:
+            raise ValueError("every and capacity must be positive")
+
+        self.names = tuple(metrics)
+        self.every = every
+        self.capacity = capacity
+
+        self.steps = array("q", [0]) * capacity
+        self.buffers = {name: array("d", [math.nan]) * capacity for name in self.names}
+
+        self.operations = 0
+        self.samples = 0          # total ever written
+        self.until_sample = every
+
+    # ---------- Recording ----------
+    def due_in(self):
+        # Operations left before the next sample
+        return self.until_sample
+
+    def advance(self, n=1):
+        # -> True when a sample is due
+        self.operations += n
+        self.until_sample -= n
+        if self.until_sample <= 0:
+            self.until_sample = self.until_sample % self.every or self.every
+            return True
+        return False
+
+    def record(self, values):
+        # values: metric name -> number; missing metrics are stored as NaN
+        slot = self.samples % self.capacity
+        self.steps[slot] = self.operations
+        for name in self.names:
+            self.buffers[name][slot] = values.get(name, math.nan)
+        self.samples += 1
+
+    # ---------- Reading ----------
+    def __len__(self):
+        return min(self.samples, self.capacity)
+
+    def _ordered(self, buffer):
+        if self.samples <= self.capacity:
+            return buffer[:self.samples]
+        start = self.samples % self.capacity
+        return buffer[start:] + buffer[:start]
+
+    def step_series(self):
+        return self._ordered(self.steps)
+
+    def series(self, name):
+        return self._ordered(self.buffers[name])
+
+    def to_csv(self, out):
+        # out: path or text file
+        if isinstance(out, str):
+            with open(out, "w", newline="") as f:
+                return self.to_csv(f)
+
+        writer = csv.writer(out)
+        writer.writerow(("operation",) + self.names)
+        columns = [self.step_series()] + [self.series(n) for n in self.names]
+        writer.writerows(zip(*columns))
+
+    def to_numpy(self):
+        # name -> 1-D array, "operation" for the sample steps; needs NumPy
+        import numpy as np
+        out = {"operation": np.frombuffer(self.step_series(), dtype=np.int64).copy()}
+        for name in self.names:
+            out[name] = np.frombuffer(self.series(name), dtype=np.float64).copy()
+        return out
@@ -0,0 +1,128 @@
+from array import array
+
+
+class _SetStack:
+    # LRU stack of one cache set as a Fenwick tree over access times: each
+    # resident block has a single mark at the time of its last access, so
+    # the blocks touched since time t are the marks after t.
+    def __init__(self, capacity=64):
+        self.last = {}        # block -> time of last access
+        self.time = 0
+        self._reset(capacity)
+
+    def _reset(self, capacity):
+        self.capacity = capacity
+        self.tree = array("q", [0]) * (capacity + 1)
+
+    def _add(self, i, delta):
+        tree = self.tree
+        i += 1
+        while i <= self.capacity:
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i):
+        # marks at times 0..i
+        tree = self.tree
+        total = 0
+        i += 1
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _compact(self):
+        # Renumber live marks 0..k-1 once the time axis is used up
+        order = sorted(self.last, key=self.last.get)
+        self._reset(max(64, 2 * len(order)))
+        for t, block in enumerate(order):
+            self.last[block] = t
+            self._add(t, 1)
+        self.time = len(order)
+
+    def access(self, block):
+        # -> stack distance (0 = most recently used), or -1 if cold
+        if self.time == self.capacity:
+            self._compact()
+
+        now = self.time
+        self.time += 1
+
+        previous = self.last.get(block)
+        if previous is None:
+            distance = -1
+        else:
+            distance = self._prefix(now - 1) - self._prefix(previous)
+            self._add(previous, -1)
+
+        self.last[block] = now
+        self._add(now, 1)
+        return distance
+
+
+class StackDistanceAnalyzer:
+    # Mattson stack-distance analysis: one pass over a trace gives the LRU
+    # miss count for every capacity. With num_sets > 1 distances are taken
+    # within each set, so a capacity means ways per set; with num_sets = 1
+    # it covers fully associative caches and LRU paging (block = page).
+    def __init__(self, block_size=1, num_sets=1):
+        self.block_size = block_size
+        self.num_sets = num_sets
+
+        self.sets = {}            # set index -> _SetStack, created lazily
+        self.histogram = {}       # distance -> count
+        self.cold_misses = 0
+        self.accesses = 0
+
+    def access(self, address):
+        block = address // self.block_size
+        set_index = block % self.num_sets
+
+        stack = self.sets.get(set_index)
+        if stack is None:
+            stack = self.sets[set_index] = _SetStack()
+
+        distance = stack.access(block)
+        self.accesses += 1
+        if distance < 0:
+            self.cold_misses += 1
+        else:
+            self.histogram[distance] = self.histogram.get(distance, 0) + 1
+        return distance
+
+    def feed(self, addresses):
+        access = self.access
+        for address in addresses:
+            access(address)
+
+    def misses(self, capacity):
+        # LRU misses with `capacity` blocks (ways per set)
+        return self.cold_misses + sum(
+            count for distance, count in self.histogram.items() if distance >= capacity
+        )
+
+    def miss_ratio_curve(self, capacities=None):
+        # capacities: ways per set (blocks / frames when num_sets = 1);
+        # defaults to every capacity up to the largest distance seen + 1
+        if capacities is None:
+            capacities = range(1, max(self.histogram, default=0) + 2)
+        capacities = sorted(capacities)
+
+        # misses(C) = cold + accesses with distance >= C
+        distances = sorted(self.histogram.items(), reverse=True)
+        curve = []
+        above = 0
+        i = 0
+        for capacity in reversed(capacities):
+            while i < len(distances) and distances[i][0] >= capacity:
+                above += distances[i][1]
+                i += 1
+            misses = self.cold_misses + above
+            curve.append({
+                "capacity": capacity,
+                "lines": capacity * self.num_sets,
+                "misses": misses,
+                "miss_ratio": misses / self.accesses if self.accesses else 0.0
+            })
+        curve.reverse()
+        return curve
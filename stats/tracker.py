@@ -1,3 +1,6 @@
+from src.stats.metrics import external_fragmentation
+
+
 class StatsTracker:
     def __init__(self, total_memory):
         self.total_memory = total_memory
@@ -40,3 +43,24 @@ class StatsTracker:
         if self.total_memory == 0:
             return 0.0
         return used_memory / self.total_memory
+
+    # ---------- Incremental (PhysicalMemory / BuddyAllocator) ----------
+    def utilization_of(self, memory):
+        # Against the model's own size, not this tracker's total_memory
+        if memory.size == 0:
+            return 0.0
+        return memory.used_bytes / memory.size
+
+    def fragmentation_of(self, memory):
+        return external_fragmentation(memory.free_bytes, memory.largest_free())
+
+    # ---------- Slab allocator (allocator.slab) ----------
+    def slab_utilization_of(self, slabs):
+        # Bytes requested by live objects over bytes held in slabs
+        if slabs.slab_bytes == 0:
+            return 0.0
+        return slabs.requested_bytes / slabs.slab_bytes
+
+    def slab_waste_of(self, slabs):
+        # Internal waste in bytes: slot rounding plus unusable slab tails
+        return slabs.waste_bytes()
@@ -0,0 +1,45 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from src.engine.cli import main
+
+# Pages 1 2 3 1 2 3 with 64-byte pages
+TRACE = "".join(f"read {page * 64}\n" for page in (1, 2, 3, 1, 2, 3))
+
+
+class RunCommandTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w") as f:
+            f.write(TRACE)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def run_cli(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(main(["run", self.path, *argv]), 0)
+        return json.loads(out.getvalue())
+
+    def test_opt_policy_loads_the_trace(self):
+        # Belady with 2 frames: faults on 1, 2, 3 and the second 2
+        summary = self.run_cli("--frames", "2", "--vm-policy", "opt")
+        self.assertEqual(summary["vm"]["page_faults"], 4)
+
+        summary = self.run_cli("--frames", "2", "--vm-policy", "FIFO")
+        self.assertEqual(summary["vm"]["page_faults"], 6)
+
+    def test_unknown_policy_is_a_usage_error(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit) as ctx:
+                main(["run", self.path, "--frames", "2", "--vm-policy", "MRU"])
+        self.assertEqual(ctx.exception.code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
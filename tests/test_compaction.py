@@ -0,0 +1,43 @@
+import unittest
+
+from src.allocator.compaction import Compactor, CompactingStrategy
+from src.allocator.first_fit import FirstFit
+from src.allocator.physical_memory import PhysicalMemory
+from src.allocator.tlsf import TLSF
+
+
+def fragmented_memory():
+    # [0-49] free, [50-59] used, [60-157] free, [158-299] used
+    memory = PhysicalMemory(300)
+    first_fit = FirstFit()
+    ids = [first_fit.malloc(memory, size) for size in (50, 10, 98, 142)]
+    memory.free(ids[0])
+    memory.free(ids[2])
+    return memory
+
+
+class CompactingStrategyTest(unittest.TestCase):
+    def test_tlsf_rounding_failure_is_compacted_and_retried(self):
+        # The 98-byte hole holds 97 bytes, but TLSF only searches classes
+        # above 97's own, so it fails without compaction
+        memory = fragmented_memory()
+        self.assertEqual(memory.largest_free(), 98)
+        self.assertIsNone(TLSF().malloc(memory, 97))
+
+        compactor = Compactor(memory)
+        block_id = CompactingStrategy(TLSF(), compactor).malloc(memory, 97)
+
+        self.assertIsNotNone(block_id)
+        self.assertEqual(memory.by_id[block_id].size, 97)
+        self.assertEqual(compactor.runs, 1)
+        self.assertEqual(compactor.rescued, 1)
+
+    def test_no_compaction_when_free_bytes_are_short(self):
+        memory = fragmented_memory()
+        compactor = Compactor(memory)
+        self.assertIsNone(CompactingStrategy(TLSF(), compactor).malloc(memory, 149))
+        self.assertEqual(compactor.runs, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import random
+import unittest
+
+from src.allocator.physical_memory import PhysicalMemory
+from src.allocator.tlsf import TLSF
+
+
+class LargestFreeTest(unittest.TestCase):
+    def test_tlsf_only_memory_tracks_the_largest_block(self):
+        # No treap is built for TLSF: the answer comes from the size classes
+        memory = PhysicalMemory(1 << 18)
+        tlsf = TLSF()
+        rng = random.Random(0)
+        live = []
+        for _ in range(5000):
+            if live and rng.random() < 0.47:
+                memory.free(live.pop(rng.randrange(len(live))))
+            else:
+                block_id = tlsf.malloc(memory, rng.randint(1, 600))
+                if block_id is not None:
+                    live.append(block_id)
+            expected = max((b.size for b in memory.blocks if b.free), default=0)
+            self.assertEqual(memory.largest_free(), expected)
+
+        self.assertFalse(memory.free_index.by_start)
+        self.assertFalse(memory.free_index.by_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
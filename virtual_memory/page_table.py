@@ -1,11 +1,171 @@
 
+import sys
+from array import array
+
 from src.virtual_memory.page import Page
 
+NOT_MAPPED = -1
+
+
 class PageTable:
-    def __init__(self):
-        self.table = {}
+    # Hierarchical (radix) page table. Interior levels are lists of child
+    # pointers, leaf levels are array('q') of frame numbers. Nodes are
+    # allocated when a page below them is mapped and released again once
+    # nothing below them is resident, so the table size is bounded by the
+    # number of resident pages rather than by the pages ever touched.
+    # The last slot of every node counts its non-empty children.
+    def __init__(self, page_bits=52, bits_per_level=9):
+        self.page_bits = page_bits
+        self.bits_per_level = bits_per_level
+        self.fanout = 1 << bits_per_level
+        self.mask = self.fanout - 1
+
+        levels = max(1, -(-page_bits // bits_per_level))
+        self.levels = levels
+        # Index shift for every interior level, top first
+        self.shifts = [bits_per_level * i for i in range(levels - 1, 0, -1)]
+
+        self.interior_nodes = 0
+        self.leaf_nodes = 0
+        self.table_bytes = 0
+        self.peak_bytes = 0
+        self.mapped = 0
+        self.walk_levels = 0     # levels read by the latest lookup()
+
+        self.root = self._new_node(levels == 1)
+
+    # ---------- Nodes ----------
+    def _new_node(self, leaf):
+        if leaf:
+            node = array("q", [NOT_MAPPED]) * (self.fanout + 1)
+            node[-1] = 0
+            self.leaf_nodes += 1
+        else:
+            node = [None] * self.fanout + [0]
+            self.interior_nodes += 1
+
+        self.table_bytes += sys.getsizeof(node)
+        if self.table_bytes > self.peak_bytes:
+            self.peak_bytes = self.table_bytes
+        return node
+
+    def _release(self, node, leaf):
+        if leaf:
+            self.leaf_nodes -= 1
+        else:
+            self.interior_nodes -= 1
+        self.table_bytes -= sys.getsizeof(node)
+
+    def _check(self, page):
+        if page < 0 or page >> self.page_bits:
+            raise ValueError(f"Page {page} outside the {self.page_bits}-bit page space")
+
+    def _leaf(self, page):
+        # The walk stops at the first missing node
+        node = self.root
+        levels = 1
+        for shift in self.shifts:
+            node = node[(page >> shift) & self.mask]
+            if node is None:
+                self.walk_levels = levels
+                return None
+            levels += 1
+        self.walk_levels = levels
+        return node
+
+    # ---------- Mapping ----------
+    def lookup(self, page):
+        # -> frame, or None if the page is not resident
+        self._check(page)
+        leaf = self._leaf(page)
+        if leaf is None:
+            return None
+        frame = leaf[page & self.mask]
+        return frame if frame >= 0 else None
+
+    def map(self, page, frame):
+        self._check(page)
+        node = self.root
+        last = len(self.shifts) - 1
+        for i, shift in enumerate(self.shifts):
+            idx = (page >> shift) & self.mask
+            child = node[idx]
+            if child is None:
+                child = node[idx] = self._new_node(i == last)
+                node[-1] += 1
+            node = child
+
+        idx = page & self.mask
+        if node[idx] < 0:
+            node[-1] += 1
+            self.mapped += 1
+        node[idx] = frame
+
+    def unmap(self, page):
+        self._check(page)
+        path = []
+        node = self.root
+        for shift in self.shifts:
+            idx = (page >> shift) & self.mask
+            path.append((node, idx))
+            node = node[idx]
+            if node is None:
+                return False
+
+        idx = page & self.mask
+        if node[idx] < 0:
+            return False
+        node[idx] = NOT_MAPPED
+        node[-1] -= 1
+        self.mapped -= 1
+
+        # Release nodes that no longer hold anything
+        leaf = True
+        while path and node[-1] == 0:
+            parent, idx = path.pop()
+            parent[idx] = None
+            parent[-1] -= 1
+            self._release(node, leaf)
+            node = parent
+            leaf = False
+        return True
 
     def get(self, page):
-        if page not in self.table:
-            self.table[page] = Page()
-        return self.table[page]
+        entry = Page()
+        frame = self.lookup(page)
+        if frame is not None:
+            entry.valid = True
+            entry.frame = frame
+        return entry
+
+    def items(self):
+        # (page, frame) for every resident page, in page order
+        bits = self.bits_per_level
+        depth_limit = len(self.shifts)
+
+        def walk(node, prefix, depth):
+            if depth == depth_limit:
+                for idx in range(self.fanout):
+                    frame = node[idx]
+                    if frame >= 0:
+                        yield (prefix << bits) | idx, frame
+                return
+            for idx in range(self.fanout):
+                child = node[idx]
+                if child is not None:
+                    yield from walk(child, (prefix << bits) | idx, depth + 1)
+
+        return walk(self.root, 0, 0)
+
+    def __len__(self):
+        return self.mapped
+
+    def overhead(self):
+        return {
+            "levels": self.levels,
+            "interior_nodes": self.interior_nodes,
+            "leaf_nodes": self.leaf_nodes,
+            "mapped_pages": self.mapped,
+            "bytes": self.table_bytes,
+            "peak_bytes": self.peak_bytes
+        }
@@ -0,0 +1,78 @@
+from array import array
+
+from src.cache.cache_level import make_policy
+
+
+class TLB:
+    def __init__(self, entries=16, associativity=None, policy="LRU"):
+        if associativity is None:
+            associativity = entries   # fully associative
+
+        self.entries = entries
+        self.associativity = associativity
+        self.num_sets = entries // associativity
+
+        if self.num_sets <= 0 or self.num_sets & (self.num_sets - 1) != 0:
+            raise ValueError("TLB set count must be a power of two")
+        self.set_mask = self.num_sets - 1
+
+        self.policy = make_policy(policy)
+        self.policy.bind(self.num_sets, associativity)
+
+        # Flat entry state, entry index = set_index * associativity + way
+        self.valid = bytearray(entries)
+        self.pages = array("q", [-1]) * entries
+        self.frames = array("q", [-1]) * entries
+
+        self.lookup = {}   # page -> entry index
+
+        self.hits = 0
+        self.misses = 0
+
+    def translate(self, page):
+        # -> frame, or None on a TLB miss
+        entry = self.lookup.get(page)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        set_index = page & self.set_mask
+        self.policy.on_hit(set_index, entry - set_index * self.associativity)
+        return self.frames[entry]
+
+    def insert(self, page, frame):
+        set_index = page & self.set_mask
+        base = set_index * self.associativity
+
+        entry = self.valid.find(0, base, base + self.associativity)
+        if entry < 0:
+            entry = base + self.policy.victim(set_index)
+            del self.lookup[self.pages[entry]]
+
+        self.valid[entry] = 1
+        self.pages[entry] = page
+        self.frames[entry] = frame
+        self.lookup[page] = entry
+        self.policy.on_fill(set_index, entry - base)
+
+    def invalidate(self, page):
+        # Shootdown after the page lost its frame
+        entry = self.lookup.pop(page, None)
+        if entry is None:
+            return False
+
+        set_index = page & self.set_mask
+        self.valid[entry] = 0
+        self.policy.on_invalidate(set_index, entry - set_index * self.associativity)
+        return True
+
+    def flush(self):
+        for page in list(self.lookup):
+            self.invalidate(page)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
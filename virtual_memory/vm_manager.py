@@ -1,69 +1,221 @@
-import math
-from collections import deque
+import heapq
+from array import array
+from collections import OrderedDict, deque
 
+from src.virtual_memory.page_table import PageTable
 
-class PageTableEntry:
-    def __init__(self):
-        self.valid = False
-        self.frame = None
+
+POLICIES = ("FIFO", "LRU", "CLOCK", "OPT")
 
 
 class VirtualMemoryManager:
-    def __init__(self, frames, page_size=64, policy="FIFO"):
+    timed_methods = {"access": "vm_access_ns"}
+
+    def __init__(self, frames, page_size=64, policy="FIFO", trace=None, tlb=None,
+                 address_bits=64):
+        policy = policy.upper()
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown page replacement policy: {policy!r}")
+
         self.page_size = page_size
         self.num_frames = frames
         self.policy = policy
 
-        self.page_table = {}      # page_number -> PageTableEntry
+        page_bits = (((1 << address_bits) - 1) // page_size).bit_length()
+        self.page_table = PageTable(page_bits)   # page_number -> frame
         self.frames = [None] * frames  # frame -> page_number
 
         self.free_frames = deque(range(frames))
-        self.replacement_queue = deque()
 
+        # Replacement state
+        self.replacement_queue = deque()  # FIFO: pages in load order
+        self.recency = OrderedDict()      # LRU: pages, least recent first
+        self.referenced = bytearray(frames)  # CLOCK: reference bit per frame
+        self.hand = 0
+
+        # OPT: next-use index of every trace position, filled by load_trace
+        self.next_use = None
+        self.position = 0
+        self.resident_next_use = {}       # page -> next use of resident page
+        self.future = []                  # max-heap of (-next_use, page)
+
+        self.accesses = 0
         self.page_faults = 0
 
+        # Optional TLB in front of the page table
+        self.tlb = tlb
+
+        self.probe = None   # stats.instrument.Probe
+
+        if trace is not None:
+            self.load_trace(trace)
+
+    def load_trace(self, virtual_addresses):
+        # Offline OPT (Belady): later accesses must replay exactly this trace
+        pages = array("q", (va // self.page_size for va in virtual_addresses))
+        n = len(pages)
+
+        next_use = array("q", [n]) * n   # n = never used again
+        last_seen = {}
+        for i in range(n - 1, -1, -1):
+            page = pages[i]
+            next_use[i] = last_seen.get(page, n)
+            last_seen[page] = i
+
+        self.next_use = next_use
+        self.position = 0
+
     def access(self, virtual_address):
+        self.accesses += 1
         page = virtual_address // self.page_size
         offset = virtual_address % self.page_size
 
-        if page not in self.page_table:
-            self.page_table[page] = PageTableEntry()
-
-        entry = self.page_table[page]
+        # TLB HIT: no page table walk
+        tlb = self.tlb
+        if tlb is not None:
+            frame = tlb.translate(page)
+            if frame is not None:
+                self._touch(page, frame)
+                return {
+                    "page": page,
+                    "offset": offset,
+                    "frame": frame,
+                    "fault": False,
+                    "tlb_hit": True,
+                    "evicted": None
+                }
+
+        frame = self.page_table.lookup(page)
+        if self.probe is not None:
+            self.probe.record("page_walk_levels", self.page_table.walk_levels)
 
         # PAGE HIT
-        if entry.valid:
+        if frame is not None:
+            self._touch(page, frame)
+            if tlb is not None:
+                tlb.insert(page, frame)
             return {
                 "page": page,
                 "offset": offset,
-                "frame": entry.frame,
-                "fault": False
+                "frame": frame,
+                "fault": False,
+                "tlb_hit": False,
+                "evicted": None
             }
 
         # PAGE FAULT
         self.page_faults += 1
 
         # Get frame
+        victim_page = None
         if self.free_frames:
             frame = self.free_frames.popleft()
         else:
-            # FIFO replacement
-            victim_page = self.replacement_queue.popleft()
-            victim_entry = self.page_table[victim_page]
-            frame = victim_entry.frame
-
-            victim_entry.valid = False
-            victim_entry.frame = None
+            victim_page = self._victim()
+            frame = self.page_table.lookup(victim_page)
+            self.page_table.unmap(victim_page)
+            if tlb is not None:
+                tlb.invalidate(victim_page)
 
         # Map new page
-        entry.valid = True
-        entry.frame = frame
+        self.page_table.map(page, frame)
         self.frames[frame] = page
-        self.replacement_queue.append(page)
+        self._admit(page, frame)
+        if tlb is not None:
+            tlb.insert(page, frame)
 
         return {
             "page": page,
             "offset": offset,
             "frame": frame,
-            "fault": True
+            "fault": True,
+            "tlb_hit": False,
+            "evicted": victim_page
+        }
+
+    def access_batch(self, virtual_addresses):
+        # -> physical address and fault flag per access
+        access = self.access
+        page_size = self.page_size
+        physical = array("q")
+        faults = bytearray()
+
+        for va in virtual_addresses:
+            result = access(va)
+            physical.append(result["frame"] * page_size + result["offset"])
+            faults.append(result["fault"])
+
+        return {
+            "physical": physical,
+            "fault": faults,
+            "page_faults": self.page_faults
         }
+
+    def fault_rate(self):
+        if self.accesses == 0:
+            return 0.0
+        return self.page_faults / self.accesses
+
+    # ---------- Replacement policies ----------
+    def _next_use(self):
+        if self.next_use is None:
+            raise RuntimeError("OPT replacement needs load_trace() first")
+        pos = self.position
+        self.position += 1
+        if pos >= len(self.next_use):
+            return pos + len(self.next_use)   # past the trace: never again
+        return self.next_use[pos]
+
+    def _touch(self, page, frame):
+        policy = self.policy
+        if policy == "LRU":
+            self.recency.move_to_end(page)
+        elif policy == "CLOCK":
+            self.referenced[frame] = 1
+        elif policy == "OPT":
+            nxt = self._next_use()
+            self.resident_next_use[page] = nxt
+            heapq.heappush(self.future, (-nxt, page))
+            if len(self.future) > 4 * self.num_frames + 64:
+                # Drop stale heap entries
+                self.future = [(-n, p) for p, n in self.resident_next_use.items()]
+                heapq.heapify(self.future)
+
+    def _admit(self, page, frame):
+        policy = self.policy
+        if policy == "FIFO":
+            self.replacement_queue.append(page)
+        elif policy == "LRU":
+            self.recency[page] = None
+        elif policy == "CLOCK":
+            self.referenced[frame] = 1
+        else:
+            nxt = self._next_use()
+            self.resident_next_use[page] = nxt
+            heapq.heappush(self.future, (-nxt, page))
+
+    def _victim(self):
+        policy = self.policy
+        if policy == "FIFO":
+            return self.replacement_queue.popleft()
+
+        if policy == "LRU":
+            return self.recency.popitem(last=False)[0]
+
+        if policy == "CLOCK":
+            # Second chance: skip and clear referenced frames
+            referenced = self.referenced
+            hand = self.hand
+            while referenced[hand]:
+                referenced[hand] = 0
+                hand = (hand + 1) % self.num_frames
+            self.hand = (hand + 1) % self.num_frames
+            return self.frames[hand]
+
+        # OPT: resident page whose next use is furthest away
+        resident = self.resident_next_use
+        while True:
+            neg_next, page = heapq.heappop(self.future)
+            if resident.get(page) == -neg_next:
+                del resident[page]
+                return page